@@ -0,0 +1,187 @@
+"""
+Executa o workflow (classificação -> normalização -> fornecedores) em lote, sem UI.
+
+    python batch_quotes.py pedidos.csv -o resultados.jsonl --workers 8
+
+Entrada: .csv (coluna `task_text` ou `text`, outra com --column, ou arquivo de uma coluna só
+sem cabeçalho), .jsonl (`task_text` ou `text`) ou texto puro (uma tarefa por linha). Resultados saem em JSONL à medida que ficam prontos;
+no fim, vazão e latência por etapa vão para o stderr.
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+from statistics import mean, quantiles
+from typing import Iterator
+
+from resources import get_workflow
+
+
+TEXT_COLUMNS = ("task_text", "text")
+
+
+def csv_column(first_row: list[str], sample: str, column: str | None = None) -> tuple[int, bool]:
+    """
+    (índice da coluna com o texto, a primeira linha é cabeçalho?). Sem --column vale `task_text`/`text`
+    no cabeçalho ou um arquivo de uma coluna só (sem cabeçalho); qualquer outra coisa é ambígua
+    (ex.: `id,text` lido pela posição usaria o cabeçalho e os ids como tarefas) e gera ValueError.
+    """
+    names = [c.strip() for c in first_row]
+    if column is not None:
+        if column.isdigit():
+            try:
+                has_header = csv.Sniffer().has_header(sample)
+            except csv.Error:
+                has_header = False
+            return int(column), has_header
+        if column in names:
+            return names.index(column), True
+        raise ValueError(f"column {column!r} not in CSV header {names}")
+    for name in TEXT_COLUMNS:
+        if name in names:
+            return names.index(name), True
+    if len(names) <= 1:
+        return 0, False
+    raise ValueError(f"CSV header {names} has no task_text/text column; pass --column (name or index)")
+
+
+def iter_tasks(path: str, column: str | None = None) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            sample = f.read(8192)
+            f.seek(0)
+            reader = csv.reader(f)
+            first = next(reader, None) or []
+            col, has_header = csv_column(first, sample, column)
+            if not has_header and len(first) > col and first[col].strip():
+                yield first[col].strip()
+            for row in reader:
+                if len(row) > col and row[col].strip():
+                    yield row[col].strip()
+        elif path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    obj = json.loads(line)
+                    text = (obj.get("task_text") or obj.get("text") or "").strip()
+                    if text:
+                        yield text
+        else:
+            for line in f:
+                if line.strip():
+                    yield line.strip()
+
+
+def run_one(graph, task_text: str, current_date: str) -> dict:
+    run_id = str(uuid.uuid4())
+    state = {"task_text": task_text, "current_date": current_date, "run_id": run_id}
+    stages: dict[str, float] = {}
+    result: dict = {}
+    t0 = last = time.perf_counter()
+    # stream_mode="updates" devolve a saída de cada nó assim que ele termina: dá o tempo por etapa.
+    for update in graph.stream(state, stream_mode="updates"):
+        now = time.perf_counter()
+        for node, out in update.items():
+            stages[node] = round((now - last) * 1000, 2)
+            result.update(out or {})
+        last = now
+    task = result.get("task") or result.get("normalized_task") or {}
+    task["run_id"] = run_id
+    task["task_text"] = task_text
+    return {
+        "run_id": run_id,
+        "task_text": task_text,
+        "category": result.get("category"),
+        "classifier_path": result.get("classifier_path"),
+        "task": task,
+        "suppliers": [s.get("id") for s in result.get("suppliers", [])],
+        "latency_ms": round((time.perf_counter() - t0) * 1000, 2),
+        "stages_ms": stages,
+    }
+
+
+def _pct(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def report(records: list[dict], elapsed: float, errors: int, out=sys.stderr):
+    ok = len(records)
+    print(f"tasks: {ok + errors}  ok: {ok}  errors: {errors}  elapsed: {elapsed:.2f}s  "
+          f"throughput: {(ok + errors) / elapsed if elapsed else 0:.2f} tasks/s", file=out)
+    per_stage: dict[str, list[float]] = {}
+    for r in records:
+        for stage, ms in r["stages_ms"].items():
+            per_stage.setdefault(stage, []).append(ms)
+    per_stage["total"] = [r["latency_ms"] for r in records]
+    print(f"{'stage':<22}{'n':>6}{'mean ms':>12}{'p50 ms':>12}{'p95 ms':>12}", file=out)
+    for stage, vals in per_stage.items():
+        print(f"{stage:<22}{len(vals):>6}{mean(vals):>12.2f}{_pct(vals, 50):>12.2f}{_pct(vals, 95):>12.2f}", file=out)
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Roda o workflow de orçamento em lote.")
+    ap.add_argument("input", help="arquivo .csv, .jsonl ou .txt com as tarefas")
+    ap.add_argument("-o", "--output", default="-", help="arquivo JSONL de saída (padrão: stdout)")
+    ap.add_argument("-w", "--workers", type=int, default=4)
+    ap.add_argument("--current-date", default=date.today().isoformat())
+    ap.add_argument("--column", default=None, help="coluna do CSV com o texto (nome ou índice)")
+    args = ap.parse_args(argv)
+
+    tasks = iter_tasks(args.input, args.column)
+    try:
+        first = next(tasks, None)   # valida o arquivo (ex.: coluna do CSV) antes de montar o grafo
+    except ValueError as e:
+        ap.error(str(e))
+    tasks = itertools.chain([first], tasks) if first is not None else iter(())
+
+    graph = get_workflow()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    lock = threading.Lock()
+    records: list[dict] = []
+    errors = 0
+
+    def write(rec: dict):
+        with lock:
+            out.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        pending: dict = {}
+        exhausted = False
+        while pending or not exhausted:
+            # Mantém no máximo 2x workers tarefas em voo: o arquivo é lido aos poucos.
+            while not exhausted and len(pending) < args.workers * 2:
+                text = next(tasks, None)
+                if text is None:
+                    exhausted = True
+                    break
+                pending[pool.submit(run_one, graph, text, args.current_date)] = text
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                text = pending.pop(fut)
+                try:
+                    rec = fut.result()
+                    records.append(rec)
+                except Exception as e:
+                    errors += 1
+                    rec = {"task_text": text, "error": f"{type(e).__name__}: {e}"}
+                write(rec)
+    elapsed = time.perf_counter() - t0
+
+    if out is not sys.stdout:
+        out.close()
+    report(records, elapsed, errors)
+
+
+if __name__ == "__main__":
+    main()
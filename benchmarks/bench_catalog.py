@@ -0,0 +1,93 @@
+"""
+Busca de fornecedores com um catálogo grande na coleção única.
+
+    python -m benchmarks.bench_catalog --suppliers 30000
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.bench_catalog --suppliers 30000
+
+Gera N fornecedores sintéticos numa coleção própria (`bench_suppliers`, com os mesmos
+índices de `suppliers`) e mede a consulta de select_suppliers sem cache e com cache.
+Contra um MongoDB de verdade também mostra o plano vencedor (IXSCAN) e quantos
+documentos foram examinados; o mongomock não usa índices, então lá só vale o tempo.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from statistics import mean
+
+os.environ.setdefault("MONGO_URI", "mongomock://localhost")
+
+from categories import registry  # noqa: E402
+from db.mongo import MONGO_URI, db  # noqa: E402
+from db.supplier_catalog import SupplierCatalog, canonical_supplier, supplier_query  # noqa: E402
+from db.writer import INDEXES  # noqa: E402
+
+COLLECTION = "bench_suppliers"
+COLORS = ["preta", "branca", "azul", "vermelha", "cinza", "verde", "amarela", "rosa"]
+SIZES = ["PP", "P", "M", "G", "GG", "XG", "38", "40", "42", "44", "46", "48"]
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+TASKS = [
+    {"service_type": "tshirt_sale", "color": "preta", "size": "M", "desired_date": "2025-08-14"},
+    {"service_type": "pants_sale", "color": "rosa", "size": "48", "desired_date": "2025-08-17", "time_window": "morning"},
+    {"service_type": "faucet_repair", "desired_date": "2025-08-17", "time_window": "morning"},
+]
+
+
+def make_suppliers(n: int, rng: random.Random) -> list[dict]:
+    stypes = list(registry.service_types)
+    out = []
+    for i in range(n):
+        stype = stypes[i % len(stypes)]
+        clothing = registry.category_of(stype) == "clothing"
+        out.append(canonical_supplier({
+            "id": f"bench-{i:06d}", "name": f"Fornecedor {i}", "service_type": stype,
+            "category": registry.category_of(stype), "location": "Porto Alegre - RS",
+            "working_days": rng.sample(DAYS, rng.randint(3, 6)), "supports_morning": rng.random() < 0.5,
+            "inventory": {"colors": rng.sample(COLORS, 2), "sizes": rng.sample(SIZES, 4)} if clothing else {},
+        }))
+    return out
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Consulta de fornecedores num catálogo grande.")
+    ap.add_argument("--suppliers", type=int, default=30000)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    col = db[COLLECTION]
+    col.drop()
+    col.insert_many(make_suppliers(args.suppliers, random.Random(args.seed)))
+    for keys, opts in INDEXES["suppliers"]:
+        col.create_index(keys, **opts)
+    catalog = SupplierCatalog(collection=COLLECTION)
+    real_mongo = not MONGO_URI.startswith("mongomock://")
+
+    print(f"{args.suppliers} suppliers in {COLLECTION} ({'mongodb' if real_mongo else 'mongomock'})")
+    print(f"{'service_type':<16}{'matches':>9}{'cold ms':>10}{'cached ms':>11}  plan")
+    for task in TASKS:
+        query = supplier_query(task["service_type"], registry.filters_of(task["service_type"]), task)
+        cold, cached = [], []
+        for _ in range(args.repeat):
+            catalog.invalidate()
+            t0 = time.perf_counter()
+            found = catalog.query(query)
+            cold.append((time.perf_counter() - t0) * 1000)
+            t0 = time.perf_counter()
+            catalog.query(query)
+            cached.append((time.perf_counter() - t0) * 1000)
+        plan = "-"
+        if real_mongo:
+            explain = col.find(query).sort("id", 1).explain()
+            stage = explain["queryPlanner"]["winningPlan"]
+            while "inputStage" in stage:
+                stage = stage["inputStage"]
+            examined = explain.get("executionStats", {}).get("totalDocsExamined")
+            plan = f"{stage.get('stage')} {stage.get('indexName', '')} examined={examined}"
+        print(f"{task['service_type']:<16}{len(found):>9}{mean(cold):>10.2f}{mean(cached):>11.3f}  {plan}")
+    col.drop()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark dos extratores de texto (nodes/text_extract.py).
+
+    python -m benchmarks.bench_extract
+
+Compara o custo por chamada das versões atuais com as implementações
+antigas (regex montada a cada chamada / laço sobre WEEKDAY_MAP).
+"""
+import re
+import timeit
+
+from nodes.clothing_normalizer_node import _regex_extract
+from nodes.text_extract import WEEKDAY_MAP, find_weekday, parse_date
+
+SAMPLES = [
+    "Quero uma camiseta GG preta para quinta-feira",
+    "Preciso de uma calça tamanho 42 azul para sábado de manhã",
+    "Minha torneira está pingando, consegue amanhã de manhã?",
+    "Tenho sim, R$ 59,90, entrego dia 14/08 à tarde",
+    "consigo na sexta, 80 reais",
+    "não tenho disponibilidade",
+]
+
+_LEGACY_SIZE = [
+    r"\btam(?:anho)?\s*[:\-]?\s*([x]{0,3}g{1,2}|pp|p|m|g|gg|xg|xxg|xgg|xggg|xl|xxl|xxxl)\b",
+    r"\b([x]{0,3}g{1,2}|pp|p|m|g|gg|xg|xxg|xgg|xggg|xl|xxl|xxxl)\b",
+    r"\btam(?:anho)?\s*[:\-]?\s*(\d{2})\b",
+    r"\b(\d{2})\b",
+]
+_LEGACY_COLOR = [
+    r"\b(preto|preta|branco|branca|azul|vermelh[oa]|verde|amarel[oa]|cinza|rosa|roxo|marrom|bege|lil[aá]s|vinho|bord[oó])\b"
+]
+
+
+def _legacy_regex_extract(text):
+    t = text.lower()
+    stype = "pants_sale" if re.search(r"\b(cal[cç]a|pants)\b", t) else "tshirt_sale"
+    size = next((m.group(1) for p in _LEGACY_SIZE if (m := re.search(p, t, flags=re.IGNORECASE))), None)
+    color = next((m.group(1) for p in _LEGACY_COLOR if (m := re.search(p, t, flags=re.IGNORECASE))), None)
+    return color, size, stype
+
+
+def _legacy_weekday(text):
+    t = text.lower()
+    for token, wd in WEEKDAY_MAP.items():
+        if re.search(rf"\b{token}\b", t):
+            return wd
+    return None
+
+
+def _per_call_us(fn, number=20000) -> float:
+    total = timeit.timeit(lambda: [fn(s) for s in SAMPLES], number=number // len(SAMPLES))
+    return total / (number // len(SAMPLES) * len(SAMPLES)) * 1e6
+
+
+def main():
+    rows = [
+        ("clothing extract (legacy)", _legacy_regex_extract),
+        ("clothing extract", _regex_extract),
+        ("weekday (legacy)", _legacy_weekday),
+        ("weekday", find_weekday),
+        ("parse_date", lambda s: parse_date(s, "2025-08-11")),
+    ]
+    for name, fn in rows:
+        print(f"{name:<28} {_per_call_us(fn):8.2f} µs/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Contato sequencial vs concorrente (SupplierFanoutNode) com fornecedores simulados.
+
+    python -m benchmarks.bench_fanout --quotes 20 --min-latency 0.2 --max-latency 2
+
+Sequencial = o que a UI faz hoje: um fornecedor por vez até 3 ofertas. Concorrente =
+todos de uma vez, parando nas 3 primeiras aceitações. Mesmos fornecedores e mesma
+semente nos dois modos; LLM falsa (sem latência) e mongomock.
+"""
+import argparse
+import sys
+import time
+from statistics import mean, median
+
+from benchmarks.bench_workflow import FakeChatModel, seed_suppliers
+import llm_client
+from nodes.service_common import select_suppliers
+from nodes.supplier_fanout_node import SimulatedResponder, SupplierFanoutNode
+from resources import get_answer_node, get_question_node
+
+TASK = {"service_type": "tshirt_sale", "color": "preta", "size": "M", "description": "camiseta preta M",
+        "current_date": "2025-08-11"}
+
+
+def sequential(task: dict, suppliers: list[dict], responder, max_offers: int) -> tuple[float, int]:
+    qnode, anode = get_question_node(), get_answer_node()
+    t0 = time.perf_counter()
+    offers = 0
+    for sup in suppliers:
+        answer = responder(task, sup, qnode.run(task, sup))
+        if answer is not None and anode.run(task, sup, answer).get("accepted"):
+            offers += 1
+            if offers >= max_offers:
+                break
+    return (time.perf_counter() - t0) * 1000, offers
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Compara contato sequencial e concorrente.")
+    ap.add_argument("--quotes", type=int, default=10)
+    ap.add_argument("--min-latency", type=float, default=0.1)
+    ap.add_argument("--max-latency", type=float, default=1.0)
+    ap.add_argument("--accept-rate", type=float, default=0.5)
+    ap.add_argument("--partial-rate", type=float, default=0.0, help="fração que só manda o preço no follow-up")
+    ap.add_argument("--timeout", type=float, default=5.0)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args(argv)
+
+    seed_suppliers()
+    llm_client.get_llm_client().client = FakeChatModel(0)
+    suppliers = select_suppliers(TASK)
+
+    rows = {"sequential": [], "fanout": []}
+    for i in range(args.quotes):
+        task = dict(TASK, run_id=f"bench-fanout-{i}")
+        make = lambda: SimulatedResponder(args.accept_rate, args.min_latency, args.max_latency,
+                                         partial_rate=args.partial_rate, seed=args.seed + i)
+        rows["sequential"].append(sequential(task, suppliers, make(), 3))
+        out = SupplierFanoutNode(make(), timeout=args.timeout).run(task, suppliers)
+        rows["fanout"].append((out["elapsed_ms"], len(out["offers"])))
+
+    print(f"suppliers: {len(suppliers)}  quotes: {args.quotes}  latency: {args.min_latency}-{args.max_latency}s")
+    print(f"{'mode':<12}{'mean ms':>12}{'p50 ms':>12}{'max ms':>12}{'offers':>10}")
+    for mode, vals in rows.items():
+        ms = [v[0] for v in vals]
+        print(f"{mode:<12}{mean(ms):>12.1f}{median(ms):>12.1f}{max(ms):>12.1f}{mean(v[1] for v in vals):>10.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
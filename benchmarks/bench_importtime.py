@@ -0,0 +1,85 @@
+"""
+Tempo de importação dos pontos de entrada, no estilo `python -X importtime`.
+
+    python -m benchmarks.bench_importtime
+    python -m benchmarks.bench_importtime --modules workflow llm_client --top 15
+
+Para cada módulo roda um processo novo com -X importtime, soma o tempo cumulativo
+e lista os imports diretos mais caros. Também mede o processo frio até o primeiro
+grafo compilado (resources.get_workflow), que é quando langgraph passa a ser carregado.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["workflow", "resources", "llm_client", "db.writer", "batch_quotes", "quote_sessions"]
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _env() -> dict:
+    env = os.environ.copy()
+    env.setdefault("MONGO_URI", "mongomock://localhost")
+    env.setdefault("TRACE_ENABLED", "0")
+    env["PYTHONWARNINGS"] = "ignore"
+    return env
+
+
+def importtime(module: str) -> list[tuple[int, int, int, str]]:
+    """[(self_us, cumulative_us, profundidade, nome)] na ordem em que o Python reporta."""
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                         capture_output=True, text=True, env=_env())
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in res.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            rows.append((int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2, m.group(4)))
+    return rows
+
+
+def summarize(module: str, top: int) -> dict:
+    rows = importtime(module)
+    total = next((cum for _, cum, depth, name in reversed(rows) if name == module and depth == 0), 0)
+    # imports diretos (profundidade 1) do próprio módulo, ignorando o que o interpretador já carrega (site etc.)
+    children, inside = [], False
+    for self_us, cum, depth, name in reversed(rows):
+        if depth == 0:
+            inside = name == module
+            continue
+        if inside and depth == 1:
+            children.append((cum, name))
+    children.sort(reverse=True)
+    return {"module": module, "total_ms": total / 1000, "top": [(n, c / 1000) for c, n in children[:top]]}
+
+
+def first_graph_ms() -> float:
+    code = "import time; t=time.perf_counter(); import resources; resources.get_workflow(); print((time.perf_counter()-t)*1000)"
+    res = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, env=_env(), check=True)
+    return float(res.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Relatório de tempo de importação.")
+    ap.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    ap.add_argument("--top", type=int, default=5, help="imports diretos mais caros por módulo")
+    ap.add_argument("--repeat", type=int, default=3, help="execuções por módulo (fica a menor)")
+    args = ap.parse_args(argv)
+
+    for module in args.modules:
+        runs = [summarize(module, args.top) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r["total_ms"])
+        print(f"{module:<28}{best['total_ms']:>10.1f} ms")
+        for name, ms in best["top"]:
+            print(f"    {name:<32}{ms:>8.1f} ms")
+    t = time.perf_counter()
+    ms = min(first_graph_ms() for _ in range(args.repeat))
+    print(f"{'cold start -> first graph':<28}{ms:>10.1f} ms  (wall {time.perf_counter() - t:.1f}s for {args.repeat} runs)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,99 @@
+"""
+Classificador local (train_intent.py) sobre um histórico sintético de orçamentos.
+
+    python -m benchmarks.bench_intent --history 600 --requests 300
+
+Gera pedidos em pt-BR com rótulo (inclusive frases sem as palavras-chave da heurística),
+grava como db.quotes no mongomock, roda o train_intent (relatório no holdout) e depois
+classifica pedidos novos com o ClassifierNode sem e com o modelo, contando chamadas à LLM.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_workflow import FakeChatModel
+import llm_client
+from db.mongo import db
+from nodes.classifier_node import ClassifierNode
+import train_intent
+
+COLORS = ["preta", "branca", "azul", "vermelha", "cinza", "verde"]
+SIZES = ["P", "M", "G", "GG", "42", "44"]
+WHEN = ["amanhã", "sexta", "semana que vem", "hoje à tarde", "sábado de manhã", ""]
+TEMPLATES = {
+    "faucet_repair": [
+        "Minha torneira está pingando, consegue {w}?",
+        "O misturador do banheiro não para de gotejar, dá pra ver {w}?",
+        "Tem água escorrendo embaixo da pia, preciso de alguém {w}",
+        "Preciso trocar o reparo da torneira da cozinha {w}",
+        "A bica do tanque quebrou e está jorrando água",
+        "Goteira constante no metal do lavabo, quanto fica para arrumar {w}?",
+        "Alguém para olhar um vazamento no banheiro {w}",
+    ],
+    "tshirt_sale": [
+        "Quero uma camiseta {c} tamanho {s} para {w}",
+        "Vocês têm blusinha {c} {s}?",
+        "Procuro t-shirt básica {c} no {s}",
+        "Preciso de 2 camisetas {c} {s} para o uniforme",
+        "Tem baby look {c} tamanho {s}?",
+        "Quero comprar uma regata {c} {s} {w}",
+    ],
+    "pants_sale": [
+        "Quero uma calça {c} tamanho {s} para {w}",
+        "Procuro jeans {c} número {s}",
+        "Tem bermuda {c} {s}?",
+        "Preciso de uma calça social {c} no {s} {w}",
+        "Vocês vendem legging {c} {s}?",
+        "Quero um moletom de calça {c} {s}",
+    ],
+}
+
+
+def make_requests(n: int, rng: random.Random) -> list[tuple[str, str]]:
+    out = []
+    for _ in range(n):
+        service_type = rng.choice(list(TEMPLATES))
+        text = rng.choice(TEMPLATES[service_type]).format(c=rng.choice(COLORS), s=rng.choice(SIZES), w=rng.choice(WHEN))
+        out.append((" ".join(text.split()).replace(" ?", "?"), service_type))
+    return out
+
+
+def seed_quotes(samples: list[tuple[str, str]]):
+    db.quotes.delete_many({})
+    db.quotes.insert_many([{"run_id": f"bench-{i}", "task": {"task_text": t, "service_type": s}}
+                           for i, (t, s) in enumerate(samples)])
+
+
+def classify_all(node: ClassifierNode, texts: list[str]) -> tuple[float, dict]:
+    t0 = time.perf_counter()
+    for t in texts:
+        node.run(t)
+    return (time.perf_counter() - t0) * 1000 / len(texts), dict(node.stats)
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Treina e avalia o classificador de intenção local.")
+    ap.add_argument("--history", type=int, default=600)
+    ap.add_argument("--requests", type=int, default=300)
+    ap.add_argument("--llm-latency-ms", type=float, default=150)
+    ap.add_argument("--seed", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    seed_quotes(make_requests(args.history, rng))
+    path = os.path.join(tempfile.mkdtemp(), "intent_model.json")
+    train_intent.main(["--out", path])
+
+    llm_client.get_llm_client().client = FakeChatModel(args.llm_latency_ms / 1000)
+    texts = [t for t, _ in make_requests(args.requests, rng)]
+    print(f"\n{'classifier':<22}{'ms/request':>12}  paths")
+    for label, model_path in (("heuristic -> llm", ""), ("heuristic -> model", path)):
+        ms, stats = classify_all(ClassifierNode(model_path=model_path), texts)
+        print(f"{label:<22}{ms:>12.2f}  {stats}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
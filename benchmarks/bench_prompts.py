@@ -0,0 +1,168 @@
+"""
+Tokens de prompt do SupplierQuestionNode: layout antigo vs templates (prompts.py).
+
+    python -m benchmarks.bench_prompts
+
+Antigo: system prompt com os nove exemplos de todos os tipos + documento inteiro do
+fornecedor (inventory, working_days, specialties...) e da tarefa na mensagem do usuário.
+Novo: instruções fixas + exemplos do tipo de serviço, e só os campos usados no JSON.
+Contagem aproximada (~4 caracteres por token, a mesma do tracing).
+"""
+import argparse
+import json
+import os
+import sys
+from statistics import mean
+
+from prompts import SUPPLIER_QUESTION, approx_tokens
+
+LEGACY_QUESTION_PROMPT = (
+        """Você é um atendente que ajuda pessoas a resolverem tarefas. Seu papel é perguntar ao fornecedor exatamente sobre a tarefa específica que o cliente descreveu.
+        Entrada: um JSON com "task" e "supplier".
+        Saída: uma única pergunta em pt-BR, sem markdown, sem aspas, sem asteriscos, uma frase, máx. 200 caracteres, com exatamente um “?”.
+
+        Regras
+        Sem invenções: use apenas o que estiver no JSON.
+
+        Vocabulário por tipo de serviço
+
+        tshirt_sale → use o termo “camiseta”.
+
+        pants_sale → use o termo “calça”.
+
+        Atributos
+
+        Se color e/ou size existirem, mencione-os exatamente como vieram (não traduza nem reformatte).
+
+        Se color/size faltarem, pergunte a disponibilidade desses atributos.
+
+        Preço: sempre pergunte o preço.
+
+        Data e turno
+
+        Se desired_date (ISO YYYY-MM-DD) existir: formate como “no dia DD/MM/AAAA”.
+
+        Se time_window existir: morning→“de manhã”, afternoon→“à tarde”, evening→“à noite”.
+
+        Tratamento do fornecedor
+
+        Se supplier.name existir, você pode iniciar com “Olá {nome}, …”.
+
+        Restrições de saída
+
+        Uma frase, um único “?”, sem quebras de linha, ≤ 200 caracteres.
+
+        Não peça telefone, e-mail, link externo, desconto ou dados pessoais.
+
+        Não repita atributos já informados pelo cliente.
+
+        Exemplos
+        IN
+        {"task":{"service_type":"tshirt_sale","color":"preta","size":"GG","desired_date":"2025-08-14","time_window":"afternoon"},"supplier":{"name":"Loja Camiseta 1"}}
+
+        OUT
+        Olá Loja Camiseta 1, você tem camiseta preta tamanho GG no dia 14/08/2025 à tarde e qual é o preço?
+
+        IN
+        {"task":{"service_type":"pants_sale","color":null,"size":null,"desired_date":null,"time_window":null},"supplier":{"name":"Loja Calça 2"}}
+
+        OUT
+        Olá Loja Calça 2, você tem calça e quais cores e tamanhos disponíveis e qual é o preço?
+
+        IN
+        {"task":{"service_type":"tshirt_sale","color":"azul","size":"42","desired_date":null,"time_window":"morning"},"supplier":{"name":"Loja Camiseta 7"}}
+
+        OUT
+        Olá Loja Camiseta 7, você tem camiseta azul tamanho 42 de manhã e qual é o preço?
+
+        IN
+        {"task":{"service_type":"pants_sale","color":"branca","size":"M","desired_date":"2025-09-02","time_window":null},"supplier":{"name":"Loja Calça 5"}}
+
+        OUT
+        Olá Loja Calça 5, você tem calça branca tamanho M no dia 02/09/2025 e qual é o preço?
+
+        IN
+        {"task":{"service_type":"faucet_repair","desired_date":"2025-08-14","time_window":"afternoon"},"supplier":{"name":"João Encanador 1"}}
+
+        OUT
+        Olá João Encanador 1, você consegue consertar uma torneira pingando na quinta-feira (14/08/2025) à tarde? Qual seria o preço?
+
+        IN
+        {"task":{"service_type":"faucet_repair","desired_date":null,"time_window":"morning"},"supplier":{"name":"João Encanador 2"}}
+
+        OUT
+        Olá João Encanador 2, você consegue consertar uma torneira pingando de manhã? Qual seria o preço?
+
+        IN
+        {"task":{"service_type":"faucet_repair","desired_date":"2025-09-02","time_window":null},"supplier":{"name":"João Encanador 3"}}
+
+        OUT
+        Olá João Encanador 3, você consegue consertar uma torneira pingando na terça-feira (02/09/2025)? Qual seria o preço?
+
+        IN
+        {"task":{"service_type":"faucet_repair","desired_date":null,"time_window":null},"supplier":{"name":"João Encanador 4"}}
+
+        OUT
+        Olá João Encanador 4, você consegue consertar uma torneira pingando? Se sim, quando e qual seria o preço?
+
+        IN
+        {"task":{"service_type":"faucet_repair","desired_date":"2025-08-15","time_window":"evening"},"supplier":{"name":"João Encanador 5"}}
+
+        OUT
+        Olá João Encanador 5, você consegue consertar uma torneira pingando na sexta-feira (15/08/2025) à noite? Qual seria o preço?
+        
+        Responda somente a pergunta final."""
+)
+
+
+TASKS = [
+    {"service_type": "tshirt_sale", "description": "Quero uma camiseta preta tamanho M para quinta", "color": "preta",
+     "size": "M", "desired_date": "2025-08-14", "time_window": None, "run_id": "6f1c8a52-4a55-4cc0-9d7e-2f0f5d7c1a10",
+     "current_date": "2025-08-11"},
+    {"service_type": "pants_sale", "description": "Preciso de uma calça azul 42", "color": "azul", "size": "42",
+     "desired_date": None, "time_window": None, "run_id": "0b7d2e3c-1f44-4f0a-b3f1-8b1d9c7e2a55",
+     "current_date": "2025-08-11"},
+]
+COLLECTIONS = {"tshirt_sale": "suppliers_tshirt", "pants_sale": "suppliers_pants"}
+
+
+def load_suppliers() -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, "data", "suppliers_seed.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def measure(task: dict, suppliers: list[dict]) -> dict:
+    old_sys, new_sys, old_user, new_user = [], [], [], []
+    for sup in suppliers:
+        old_sys.append(approx_tokens(LEGACY_QUESTION_PROMPT))
+        old_user.append(approx_tokens(json.dumps({"task": task, "supplier": sup}, ensure_ascii=False)))
+        system, user = SUPPLIER_QUESTION.render({"task": task, "supplier": sup})
+        new_sys.append(approx_tokens(system))
+        new_user.append(approx_tokens(user))
+    return {"calls": len(suppliers), "old_system": mean(old_sys), "old_user": mean(old_user),
+            "new_system": mean(new_sys), "new_user": mean(new_user)}
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Compara tokens de prompt antes/depois dos templates.")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    seed = load_suppliers()
+    res = {t["service_type"]: measure(t, seed[COLLECTIONS[t["service_type"]]]) for t in TASKS}
+    if args.json:
+        print(json.dumps(res, indent=2))
+        return
+    print(f"{'service':<14}{'calls':>6}{'old sys':>9}{'old user':>10}{'new sys':>9}{'new user':>10}"
+          f"{'old/quote':>11}{'new/quote':>11}{'saved':>8}")
+    for stype, r in res.items():
+        old_q = (r["old_system"] + r["old_user"]) * r["calls"]
+        new_q = (r["new_system"] + r["new_user"]) * r["calls"]
+        print(f"{stype:<14}{r['calls']:>6}{r['old_system']:>9.0f}{r['old_user']:>10.0f}{r['new_system']:>9.0f}"
+              f"{r['new_user']:>10.0f}{old_q:>11.0f}{new_q:>11.0f}{1 - new_q / old_q:>8.0%}")
+    print("system prompt por tipo de serviço é fixo: só os tokens de 'user' mudam entre chamadas (prefixo reaproveitável).")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,116 @@
+"""
+Custo de inicialização: processo frio vs rerun do Streamlit com e sem o registro de recursos.
+
+    python -m benchmarks.bench_startup --reruns 50
+
+- cold: subprocesso novo que importa e constrói grafo + nós (o que a primeira sessão paga);
+- rerun antigo: build_workflow() e os três nós recriados a cada rerun (comportamento anterior);
+- rerun novo: as fábricas de resources.py, que devolvem as instâncias já construídas;
+- app rerun: se streamlit.testing estiver disponível, reexecuta o próprio streamlit_app.py.
+
+Não fala com Ollama nem MongoDB: usa mongomock e nenhum nó é executado.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from statistics import mean, median
+
+os.environ["MONGO_URI"] = "mongomock://localhost"
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+os.environ.setdefault("TRACE_ENABLED", "0")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+COLD_SNIPPET = (
+    "import time; t=time.perf_counter(); import resources; resources.warm_up(); "
+    "print((time.perf_counter()-t)*1000)"
+)
+
+
+def _ms(fn, n: int) -> list[float]:
+    out = []
+    for _ in range(n):
+        t = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t) * 1000)
+    return out
+
+
+def cold_start(n: int) -> list[float]:
+    out = []
+    for _ in range(n):
+        res = subprocess.run([sys.executable, "-W", "ignore", "-c", COLD_SNIPPET], cwd=ROOT,
+                             capture_output=True, text=True, env=os.environ.copy(), check=True)
+        out.append(float(res.stdout.strip().splitlines()[-1]))
+    return out
+
+
+def old_rerun():
+    from workflow import build_workflow
+    from nodes.supplier_question_node import SupplierQuestionNode
+    from nodes.supplier_answer_parser_node import SupplierAnswerParserNode
+    from nodes.budget_generator_node import BudgetGeneratorNode
+    build_workflow()
+    SupplierQuestionNode(); SupplierAnswerParserNode(); BudgetGeneratorNode()
+
+
+def new_rerun():
+    import resources
+    resources.get_workflow(); resources.get_question_node()
+    resources.get_answer_node(); resources.get_budget_node()
+
+
+def app_reruns(n: int) -> list[float] | None:
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+    at = AppTest.from_file(os.path.join(ROOT, "streamlit_app.py"), default_timeout=60)
+    at.run()
+    return _ms(at.run, n)
+
+
+def _summary(vals: list[float] | None) -> dict | None:
+    if not vals:
+        return None
+    return {"n": len(vals), "mean_ms": round(mean(vals), 3), "p50_ms": round(median(vals), 3),
+            "max_ms": round(max(vals), 3)}
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Mede inicialização e reruns do app.")
+    ap.add_argument("--reruns", type=int, default=50)
+    ap.add_argument("--cold", type=int, default=3, help="quantos processos frios medir")
+    ap.add_argument("--no-app", action="store_true", help="não reexecuta streamlit_app.py")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    import warnings
+    warnings.filterwarnings("ignore")
+    import resources
+    resources.warm_up()  # importações já feitas: os reruns medem só a construção
+
+    res = {
+        "cold_start": _summary(cold_start(args.cold)),
+        "rerun_rebuild": _summary(_ms(old_rerun, args.reruns)),
+        "rerun_cached": _summary(_ms(new_rerun, args.reruns)),
+        "app_rerun": None if args.no_app else _summary(app_reruns(args.reruns)),
+    }
+    if args.json:
+        print(json.dumps(res, indent=2))
+        return
+    print(f"{'scenario':<16}{'n':>6}{'mean ms':>12}{'p50 ms':>12}{'max ms':>12}")
+    for name, s in res.items():
+        if s is None:
+            print(f"{name:<16}{'-':>6}")
+            continue
+        print(f"{name:<16}{s['n']:>6}{s['mean_ms']:>12.3f}{s['p50_ms']:>12.3f}{s['max_ms']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
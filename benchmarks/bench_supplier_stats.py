@@ -0,0 +1,79 @@
+"""
+Contatos por orçamento com e sem o histórico de supplier_stats na ordenação.
+
+    python -m benchmarks.bench_supplier_stats --quotes 200
+
+Cada fornecedor do seed recebe uma chance de aceite e um preço fixos (mesma semente
+nos dois modos). Os orçamentos são feitos um depois do outro, contatando a fila de
+select_suppliers até juntar 3 ofertas; o resultado de cada contato vai para
+supplier_stats pelo writer, como no app. mongomock, sem LLM.
+"""
+import argparse
+import random
+import sys
+from statistics import mean
+
+from benchmarks.bench_workflow import seed_suppliers
+from db.mongo import db
+from db.supplier_stats import record_outcome, stats
+from db.writer import writer
+import nodes.service_common as service_common
+
+TASKS = [
+    {"service_type": "tshirt_sale", "color": "preta", "size": "M"},
+    {"service_type": "pants_sale", "color": "branca", "size": "42"},
+    {"service_type": "faucet_repair"},
+]
+
+
+def simulate(n_quotes: int, use_stats: bool, seed: int, max_offers: int) -> dict:
+    db.supplier_stats.delete_many({})
+    stats.invalidate()
+    service_common.SUPPLIER_STATS_RANKING = use_stats
+    rng = random.Random(seed)
+    profile: dict[str, tuple[float, float]] = {}     # id -> (chance de aceite, preço base)
+    for s in db.suppliers.find({}, {"id": 1}).sort("id", 1):
+        profile[s["id"]] = (rng.choice([0.05, 0.2, 0.5, 0.8, 0.95]), rng.uniform(40, 120))
+
+    rng = random.Random(seed + 1)
+    contacts, prices, short = [], [], 0
+    for i in range(n_quotes):
+        task = TASKS[i % len(TASKS)]
+        offers, n = [], 0
+        for sup in service_common.select_suppliers(task):
+            n += 1
+            p_accept, base = profile[sup["id"]]
+            if rng.random() < p_accept:
+                offer = {"name": sup.get("name"), "price": round(base * rng.uniform(0.9, 1.1), 2)}
+                offers.append(offer)
+                record_outcome(task, sup, "accepted", offer)
+            else:
+                record_outcome(task, sup, rng.choice(["rejected", "no_answer"]))
+            if len(offers) >= max_offers:
+                break
+        contacts.append(n)
+        prices += [o["price"] for o in offers]
+        short += len(offers) < max_offers
+        writer.flush()
+        stats.invalidate()   # no app o cache vence pelo TTL; aqui cada orçamento já vê o anterior
+    half = len(contacts) // 2
+    return {"contacts": mean(contacts), "contacts_2nd_half": mean(contacts[half:]) if half else mean(contacts),
+            "price": mean(prices) if prices else 0.0, "short": short}
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Contatos por orçamento com/sem supplier_stats.")
+    ap.add_argument("--quotes", type=int, default=150)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--max-offers", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    seed_suppliers()
+    print(f"{'ranking':<14}{'contacts/quote':>16}{'2nd half':>10}{'avg price':>11}{'<3 offers':>11}")
+    for label, use_stats in (("catalog only", False), ("with stats", True)):
+        r = simulate(args.quotes, use_stats, args.seed, args.max_offers)
+        print(f"{label:<14}{r['contacts']:>16.2f}{r['contacts_2nd_half']:>10.2f}{r['price']:>11.2f}{r['short']:>11}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,246 @@
+"""
+Benchmark offline do caminho completo, sem Ollama nem MongoDB reais.
+
+    python -m benchmarks.bench_workflow --tasks 200 --llm-latency-ms 150
+
+Usa um modelo de chat falso (latência configurável, respostas JSON prontas) no lugar do
+ChatOllama e mongomock no lugar do MongoDB. Para cada tarefa de um corpus gerado em pt-BR
+roda build_workflow().invoke, SupplierQuestionNode, SupplierAnswerParserNode e
+BudgetGeneratorNode, e reporta p50/p95 por etapa, chamadas à LLM por etapa e memória.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from statistics import mean, quantiles
+
+os.environ["MONGO_URI"] = "mongomock://localhost"  # precisa vir antes de importar db.mongo
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+os.environ.setdefault("TRACE_ENABLED", "0")
+
+from langchain_core.messages import AIMessage  # noqa: E402
+
+import llm_client  # noqa: E402
+from db.mongo import db  # noqa: E402
+from db.writer import writer  # noqa: E402
+from nodes.budget_generator_node import BudgetGeneratorNode  # noqa: E402
+from nodes.service_common import QUOTE_MAX_OFFERS  # noqa: E402
+from nodes.supplier_answer_parser_node import SupplierAnswerParserNode  # noqa: E402
+from nodes.supplier_question_node import SupplierQuestionNode  # noqa: E402
+from nodes.text_extract import find_color, find_size, is_pants, parse_price, yes_no_intent  # noqa: E402
+from seed_db import seed  # noqa: E402
+from workflow import build_workflow  # noqa: E402
+
+CURRENT_DATE = "2025-08-11"
+
+ITEMS = ["camiseta", "camisa", "calça"]
+COLORS = ["preta", "branca", "azul", "preto", "branco"]
+SIZES = ["P", "M", "G", "GG", "42", "44"]
+WHEN = ["amanhã", "quinta-feira", "sexta de manhã", "sábado à tarde", "depois de amanhã", ""]
+REPLIES = [
+    "sim, R$ {p},00, {w}",
+    "Tenho sim, {p} reais",
+    "não tenho no momento",
+    "tenho sim",
+    "Consigo, fica R$ {p},90 mas só à tarde",
+    "infelizmente não consigo",
+    "pode ser, valor R$ {p}",
+]
+
+
+def make_corpus(n: int, rng: random.Random) -> list[str]:
+    out = []
+    for _ in range(n):
+        kind = rng.random()
+        w = rng.choice(WHEN)
+        if kind < 0.55:
+            out.append(f"Quero uma {rng.choice(ITEMS)} {rng.choice(COLORS)} tamanho {rng.choice(SIZES)} para {w}".strip())
+        elif kind < 0.9:
+            out.append(f"Minha torneira está pingando, consegue {w}?".replace(" ?", "?"))
+        else:
+            out.append(f"Preciso de um orçamento para {w}".strip())
+    return out
+
+
+def make_reply(rng: random.Random) -> str:
+    return rng.choice(REPLIES).format(p=rng.randint(40, 250), w=rng.choice(WHEN)).strip(", ")
+
+
+class FakeChatModel:
+    """Imita ChatOllama.invoke/ainvoke: dorme `latency` e devolve JSON coerente com cada prompt."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _kind(self, system: str) -> str:
+        if "classify and extract" in system:
+            return "task_extractor"
+        if "Return ONLY one label" in system:
+            return "classifier"
+        if "tarefa manual" in system:
+            return "manual_normalizer"
+        if "information extractor" in system:
+            return "clothing_normalizer"
+        if "RESPOSTA do fornecedor" in system:
+            return "answer_parser"
+        if "follow-up" in system:
+            return "followup"
+        if "pergunta" in system.lower():
+            return "supplier_question"
+        return "other"
+
+    def _answer(self, kind: str, user: str) -> str:
+        if kind == "classifier":
+            return "clothing" if re.search(r"cal[cç]a|camis", user, re.IGNORECASE) else "manual_process"
+        if kind == "manual_normalizer":
+            return json.dumps({"service_type": "faucet_repair", "description": user, "location": None, "desired_date": None})
+        if kind == "task_extractor":
+            text = json.loads(user).get("task_text", "")
+            if re.search(r"cal[cç]a|camis", text, re.IGNORECASE):
+                return json.dumps({"category": "clothing", "service_type": "pants_sale" if is_pants(text) else "tshirt_sale",
+                                   "description": text, "color": find_color(text), "size": find_size(text),
+                                   "location": None, "desired_date": None})
+            return json.dumps({"category": "manual_process", "service_type": "faucet_repair", "description": text,
+                               "color": None, "size": None, "location": None, "desired_date": None})
+        if kind == "clothing_normalizer":
+            text = json.loads(user).get("task_text", "")
+            return json.dumps({"service_type": "pants_sale" if is_pants(text) else "tshirt_sale", "description": text,
+                               "color": find_color(text), "size": find_size(text), "desired_date": None})
+        if kind == "answer_parser":
+            answer = json.loads(user).get("answer", "")
+            ok = yes_no_intent(answer) is not False
+            return json.dumps({"can_do": ok, "meets_date": ok, "meets_time_window": ok,
+                               "price": parse_price(answer), "supplier_date": None, "notes": answer})
+        if kind == "supplier_question":
+            return "Olá, você tem camiseta disponível nesse tamanho e qual é o preço?"
+        if kind == "followup":
+            return "STOP"
+        return ""
+
+    def invoke(self, messages):
+        system, user = messages[0].content, messages[-1].content
+        kind = self._kind(system)
+        with self._lock:
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+        time.sleep(self.latency)
+        content = self._answer(kind, user)
+        return AIMessage(content=content, response_metadata={
+            "prompt_eval_count": (len(system) + len(user)) // 4, "eval_count": len(content) // 4})
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+def seed_suppliers():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    seed(path=os.path.join(root, "data", "suppliers_seed.json"), quiet=True)
+
+
+def _pct(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def run(n_tasks: int, latency_ms: float, suppliers_per_task: int, seed: int, trace_memory: bool,
+        mode: str | None = None) -> dict:
+    rng = random.Random(seed)
+    seed_suppliers()
+    fake = FakeChatModel(latency_ms / 1000)
+    llm_client.get_llm_client().client = fake
+
+    graph = build_workflow(mode)
+    qnode, anode, bnode = SupplierQuestionNode(), SupplierAnswerParserNode(), BudgetGeneratorNode()
+    corpus = make_corpus(n_tasks, rng)
+    timings: dict[str, list[float]] = {"workflow": [], "supplier_question": [], "answer_parser": [],
+                                       "budget": [], "quote_total": []}
+
+    if trace_memory:
+        tracemalloc.start()
+    t_start = time.perf_counter()
+    for i, text in enumerate(corpus):
+        t0 = time.perf_counter()
+        res = graph.invoke({"task_text": text, "current_date": CURRENT_DATE, "run_id": f"bench-{i}"})
+        timings["workflow"].append((time.perf_counter() - t0) * 1000)
+        task = res.get("task") or res.get("normalized_task") or {}
+        task.update(run_id=f"bench-{i}", current_date=CURRENT_DATE)
+
+        offers = []
+        for sup in res.get("suppliers", [])[:suppliers_per_task]:
+            t = time.perf_counter()
+            qnode.run(task, sup)
+            timings["supplier_question"].append((time.perf_counter() - t) * 1000)
+            t = time.perf_counter()
+            out = anode.run(task, sup, make_reply(rng))
+            timings["answer_parser"].append((time.perf_counter() - t) * 1000)
+            if out.get("offer"):
+                offers.append(out["offer"])
+            if len(offers) >= QUOTE_MAX_OFFERS:
+                break
+
+        t = time.perf_counter()
+        bnode.run({"offers": offers, "task": task})
+        timings["budget"].append((time.perf_counter() - t) * 1000)
+        timings["quote_total"].append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - t_start
+    writer.flush(timeout=30)
+
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "tasks": n_tasks,
+        "llm_latency_ms": latency_ms,
+        "elapsed_s": round(elapsed, 3),
+        "quotes_per_s": round(n_tasks / elapsed, 2) if elapsed else None,
+        "stages": {k: {"n": len(v), "mean_ms": round(mean(v), 2) if v else 0.0,
+                       "p50_ms": round(_pct(v, 50), 2), "p95_ms": round(_pct(v, 95), 2)}
+                   for k, v in timings.items()},
+        "llm_calls": dict(sorted(fake.calls.items())),
+        "llm_calls_per_quote": round(sum(fake.calls.values()) / n_tasks, 2) if n_tasks else 0.0,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "tracemalloc_peak_mb": round(peak / 2**20, 2) if peak is not None else None,
+        "offers_saved": db.offers.count_documents({}),
+        "quotes_saved": db.quotes.count_documents({}),
+    }
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Benchmark offline do fluxo de orçamento.")
+    ap.add_argument("--tasks", type=int, default=100)
+    ap.add_argument("--llm-latency-ms", type=float, default=50.0)
+    ap.add_argument("--suppliers-per-task", type=int, default=6)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--mode", choices=["two_step", "fused"], help="WORKFLOW_MODE (padrão: o do ambiente)")
+    ap.add_argument("--tracemalloc", action="store_true", help="mede pico de alocação (deixa tudo mais lento)")
+    ap.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = ap.parse_args(argv)
+
+    res = run(args.tasks, args.llm_latency_ms, args.suppliers_per_task, args.seed, args.tracemalloc, args.mode)
+    if args.json:
+        print(json.dumps(res, indent=2))
+        return
+    print(f"tasks: {res['tasks']}  llm latency: {res['llm_latency_ms']} ms  elapsed: {res['elapsed_s']} s  "
+          f"quotes/s: {res['quotes_per_s']}")
+    print(f"{'stage':<20}{'n':>6}{'mean ms':>12}{'p50 ms':>12}{'p95 ms':>12}")
+    for stage, s in res["stages"].items():
+        print(f"{stage:<20}{s['n']:>6}{s['mean_ms']:>12.2f}{s['p50_ms']:>12.2f}{s['p95_ms']:>12.2f}")
+    print("llm calls:", ", ".join(f"{k}={v}" for k, v in res["llm_calls"].items()) or "-",
+          f"(per quote: {res['llm_calls_per_quote']})")
+    print(f"memory: max rss {res['max_rss_mb']} MB"
+          + (f", tracemalloc peak {res['tracemalloc_peak_mb']} MB" if res["tracemalloc_peak_mb"] is not None else ""))
+    print(f"mongo: offers={res['offers_saved']} quotes={res['quotes_saved']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,70 @@
+"""
+Registro de categorias e tipos de serviço (data/categories.json).
+
+    categoria -> normalizador (nó do grafo que extrai os campos do texto)
+    service_type -> categoria + filtros da busca de fornecedores
+
+O grafo, o ServiceNode, o TaskExtractorNode e o modelo de intenção leem daqui.
+Um service_type novo numa categoria existente é só uma entrada no JSON e
+fornecedores com esse `service_type` na coleção `suppliers`.
+"""
+import json
+import os
+
+CATEGORY_REGISTRY_PATH = os.getenv(
+    "CATEGORY_REGISTRY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "categories.json"))
+
+# filtros que o catálogo sabe transformar em consulta (ver db/supplier_catalog.supplier_query)
+KNOWN_FILTERS = {"color", "size", "working_day", "morning"}
+
+
+class CategoryRegistry:
+    def __init__(self, categories: dict[str, dict], service_types: dict[str, dict], default_category: str):
+        self.categories = categories
+        self.service_types = service_types
+        self.default_category = default_category
+        self._validate()
+
+    @classmethod
+    def load(cls, path: str = CATEGORY_REGISTRY_PATH) -> "CategoryRegistry":
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        return cls(payload["categories"], payload["service_types"],
+                   payload.get("default_category") or next(iter(payload["categories"])))
+
+    def _validate(self):
+        if self.default_category not in self.categories:
+            raise ValueError(f"default_category {self.default_category!r} is not a category")
+        for name, cat in self.categories.items():
+            if not cat.get("normalizer"):
+                raise ValueError(f"category {name!r} has no normalizer")
+        for name, st in self.service_types.items():
+            if st.get("category") not in self.categories:
+                raise ValueError(f"service_type {name!r} points to unknown category {st.get('category')!r}")
+            unknown = set(st.get("filters", [])) - KNOWN_FILTERS
+            if unknown:
+                raise ValueError(f"service_type {name!r} has unknown filters {sorted(unknown)}")
+
+    def category_of(self, service_type: str | None) -> str | None:
+        return (self.service_types.get(service_type) or {}).get("category")
+
+    def service_types_of(self, category: str | None) -> list[str]:
+        return [name for name, st in self.service_types.items() if st["category"] == category]
+
+    def normalizer_of(self, category: str | None) -> str:
+        """Categoria desconhecida (ou ausente) vai para o normalizador da categoria padrão."""
+        cat = self.categories.get(category) or self.categories[self.default_category]
+        return cat["normalizer"]
+
+    def normalizers(self) -> list[str]:
+        return list(dict.fromkeys(cat["normalizer"] for cat in self.categories.values()))
+
+    def filters_of(self, service_type: str | None) -> list[str]:
+        return list((self.service_types.get(service_type) or {}).get("filters", []))
+
+    def legacy_collections(self) -> dict[str, str]:
+        """service_type -> coleção antiga (suppliers_*), usada só na migração do seed_db."""
+        return {name: st["legacy_collection"] for name, st in self.service_types.items() if st.get("legacy_collection")}
+
+
+registry = CategoryRegistry.load()
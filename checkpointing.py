@@ -0,0 +1,42 @@
+import logging
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# memory (padrão, só no processo) | sqlite | mongo
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "memory").lower()
+CHECKPOINT_SQLITE_PATH = os.getenv("CHECKPOINT_SQLITE_PATH", "checkpoints.sqlite")
+CHECKPOINT_MONGO_DB = os.getenv("CHECKPOINT_MONGO_DB")   # padrão: o mesmo MONGO_DB do app
+
+log = logging.getLogger("quote.checkpoint")
+
+
+def make_checkpointer(backend: str | None = None):
+    """
+    Checkpointer do LangGraph para as sessões de orçamento (thread_id = run_id).
+    sqlite e mongo permitem retomar a sessão em outro processo; exigem
+    `pip install langgraph-checkpoint-sqlite` / `langgraph-checkpoint-mongodb`.
+    Sem o pacote, cai para memória (e avisa no log).
+    """
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    backend = (backend or CHECKPOINT_BACKEND).lower()
+    if backend == "sqlite":
+        try:
+            import sqlite3
+            from langgraph.checkpoint.sqlite import SqliteSaver
+            conn = sqlite3.connect(CHECKPOINT_SQLITE_PATH, check_same_thread=False)
+            return SqliteSaver(conn)
+        except ImportError:
+            log.warning("langgraph-checkpoint-sqlite not installed; using in-memory checkpoints")
+    elif backend == "mongo":
+        try:
+            from langgraph.checkpoint.mongodb import MongoDBSaver
+            from db.mongo import MONGO_DB, get_client
+            return MongoDBSaver(get_client(), db_name=CHECKPOINT_MONGO_DB or MONGO_DB)
+        except ImportError:
+            log.warning("langgraph-checkpoint-mongodb not installed; using in-memory checkpoints")
+    elif backend != "memory":
+        log.warning("unknown CHECKPOINT_BACKEND %r; using in-memory checkpoints", backend)
+    return InMemorySaver()
@@ -1,5 +1,5 @@
 import os
-from pymongo import MongoClient
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,5 +7,43 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 MONGO_DB = os.getenv("MONGO_DB", "quote_system_db")
 
-client = MongoClient(MONGO_URI)
-db = client[MONGO_DB]
+_client = None
+_lock = threading.Lock()
+
+def get_client():
+    """MongoClient criado no primeiro uso (importar este módulo não carrega o pymongo nem conecta)."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                if MONGO_URI.startswith("mongomock://"):
+                    # Banco em memória para benchmarks/testes offline (pip install mongomock).
+                    import mongomock
+                    _client = mongomock.MongoClient()
+                else:
+                    from pymongo import MongoClient
+                    _client = MongoClient(MONGO_URI)
+    return _client
+
+def get_db():
+    return get_client()[MONGO_DB]
+
+
+class _Lazy:
+    """Repassa atributos/itens para o objeto real, criado só quando alguém o usa."""
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+
+    def __getattr__(self, name):
+        return getattr(self._factory(), name)
+
+    def __getitem__(self, key):
+        return self._factory()[key]
+
+    def __repr__(self):
+        return f"<lazy {self._factory.__name__}()>"
+
+
+client = _Lazy(get_client)
+db = _Lazy(get_db)
@@ -0,0 +1,143 @@
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from db.mongo import db
+from tracing import tracer
+
+SUPPLIER_COLLECTION = os.getenv("SUPPLIER_COLLECTION", "suppliers")
+SUPPLIER_CATALOG_TTL = float(os.getenv("SUPPLIER_CATALOG_TTL", "300"))       # segundos de cache por consulta
+SUPPLIER_CATALOG_WATCH = os.getenv("SUPPLIER_CATALOG_WATCH", "0") in {"1", "true", "yes"}
+SUPPLIER_QUERY_CACHE_SIZE = int(os.getenv("SUPPLIER_QUERY_CACHE_SIZE", "256"))  # consultas distintas em cache
+
+WEEKDAY_CODES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def weekday_code(desired_date: str | None) -> str | None:
+    if not desired_date:
+        return None
+    try:
+        return WEEKDAY_CODES[date.fromisoformat(desired_date).weekday()]
+    except ValueError:
+        return None
+
+
+# filtro do registro -> (campo da tarefa, campo do fornecedor, forma canônica do valor)
+FILTERS = {
+    "color": ("color", "inventory.colors", lambda v: str(v).strip().lower()),
+    "size": ("size", "inventory.sizes", lambda v: str(v).strip().upper()),
+    "working_day": ("desired_date", "working_days", weekday_code),
+}
+
+
+def canonical_supplier(doc: dict) -> dict:
+    """
+    Mesma forma canônica que supplier_query usa: cores minúsculas, tamanhos maiúsculos, dias
+    minúsculos. Listas vazias são removidas (campo ausente = cadastro não informa).
+    """
+    d = copy.deepcopy(doc)
+    d.pop("_id", None)
+    inv = d.get("inventory") or {}
+    for key, canon in (("colors", str.lower), ("sizes", str.upper)):
+        values = [canon(str(v).strip()) for v in inv.get(key) or []]
+        if values:
+            inv[key] = values
+        else:
+            inv.pop(key, None)
+    d["inventory"] = inv
+    days = [str(v).strip().lower() for v in d.get("working_days") or []]
+    if days:
+        d["working_days"] = days
+    else:
+        d.pop("working_days", None)
+    return d
+
+
+def supplier_query(service_type: str | None, filters: list[str], task: dict) -> dict:
+    """
+    Filtro do Mongo para a tarefa. Cada campo filtrado casa com o valor pedido ou com cadastro
+    que não informa (ausente/vazio), como em service_common.supplier_score; assim a consulta
+    usa os índices (service_type, <campo>) e o Python só ordena o que voltou.
+    """
+    query: dict = {"service_type": service_type}
+    for name in filters:
+        if name == "morning":
+            if task.get("time_window") == "morning":
+                query["supports_morning"] = {"$ne": False}
+            continue
+        task_field, field, canon = FILTERS[name]
+        raw = task.get(task_field)
+        value = canon(raw) if raw else None
+        if value:
+            query[field] = {"$in": [value, None, []]}
+    return query
+
+
+class SupplierCatalog:
+    """
+    Consultas à coleção única `suppliers`, com cache por filtro (TTL + LRU). O filtro
+    vai inteiro para o Mongo e é atendido pelos índices (service_type, cor/tamanho/dia)
+    criados em db.writer.ensure_indexes; o cache só evita repetir a mesma consulta.
+    Invalidado via change stream, se habilitado.
+    """
+
+    def __init__(self, collection: str = SUPPLIER_COLLECTION, ttl: float = SUPPLIER_CATALOG_TTL,
+                 cache_size: int = SUPPLIER_QUERY_CACHE_SIZE):
+        self.collection = collection
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._watcher: threading.Thread | None = None
+
+    def query(self, filter: dict) -> list[dict]:
+        """
+        Fornecedores que casam com `filter`, ordenados por id (ordem do cadastro); cópias. Sem limite:
+        a ordem que importa é a de rank_suppliers (histórico em supplier_stats), que precisa ver
+        todos os candidatos; cortar por id deixaria bons fornecedores de id alto fora da fila.
+        """
+        key = json.dumps(filter, sort_keys=True, default=str)
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None and (not self.ttl or time.monotonic() - hit[0] < self.ttl):
+                self._cache.move_to_end(key)
+                return copy.deepcopy(hit[1])
+        with tracer.span("mongo", f"{self.collection}.find"):
+            docs = list(db[self.collection].find(filter, {"_id": 0}).sort("id", 1))
+        with self._lock:
+            self._cache[key] = (time.monotonic(), docs)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return copy.deepcopy(docs)
+
+    def for_task(self, task: dict, filters: list[str]) -> list[dict]:
+        return self.query(supplier_query(task.get("service_type"), filters, task))
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    def watch(self):
+        """Invalida o cache a cada alteração em `suppliers` (exige replica set). Roda em thread daemon."""
+        if self._watcher is not None:
+            return
+
+        def _loop():
+            try:
+                with db[self.collection].watch() as stream:
+                    for _ in stream:
+                        self.invalidate()
+            except Exception:
+                pass  # sem replica set: segue só com o TTL
+
+        self._watcher = threading.Thread(target=_loop, name="supplier-catalog-watch", daemon=True)
+        self._watcher.start()
+
+
+catalog = SupplierCatalog()
+if SUPPLIER_CATALOG_WATCH:
+    catalog.watch()
@@ -0,0 +1,166 @@
+"""
+Estatísticas por fornecedor, mantidas de forma incremental na coleção `supplier_stats`.
+
+Cada contato encerrado vira um único upsert enfileirado no writer: $inc no contador
+do resultado e $push/$slice nas últimas cotações de preço (geral e por tamanho).
+Nada é recalculado a partir de `offers`; taxa de aceite e mediana saem do documento
+na leitura.
+
+    {"supplier_id": "ts-001", "service_type": "tshirt_sale",
+     "outcomes": {"accepted": 7, "rejected": 2, "no_answer": 1},
+     "prices": {"_all": [49.9, 55.0], "M": [49.9]},
+     "last_outcome": "accepted", "updated_at": ...}
+
+    python -m db.supplier_stats                 # resumo por fornecedor
+    python -m db.supplier_stats --backfill      # preenche a coleção vazia a partir de db.offers
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from statistics import median
+from db.mongo import db
+from db.writer import writer
+from tracing import tracer
+
+SUPPLIER_STATS_TTL = float(os.getenv("SUPPLIER_STATS_TTL", "60"))                  # segundos entre recargas
+SUPPLIER_STATS_PRICE_SAMPLES = int(os.getenv("SUPPLIER_STATS_PRICE_SAMPLES", "50"))  # preços guardados por chave
+SUPPLIER_STATS_PRIOR = float(os.getenv("SUPPLIER_STATS_PRIOR", "2"))               # peso (em contatos) do aceite a priori
+
+log = logging.getLogger("quote.stats")
+
+OUTCOMES = ("accepted", "rejected", "no_answer", "timeout", "skipped")
+# "skipped" (o operador pulou) não diz nada sobre o fornecedor: fica fora da taxa de aceite.
+CONTACTED = ("accepted", "rejected", "no_answer", "timeout")
+ALL_SIZES = "_all"
+
+
+def _size_key(size) -> str | None:
+    """Tamanho como nome de campo do Mongo (sem '.' nem '$')."""
+    if size is None or not str(size).strip():
+        return None
+    return str(size).strip().upper().replace(".", "_").replace("$", "_")
+
+
+def stats_update(outcome: str, price: float | None = None, size: str | None = None,
+                 now: datetime | None = None) -> dict:
+    update = {"$inc": {f"outcomes.{outcome}": 1},
+              "$set": {"last_outcome": outcome, "updated_at": now or datetime.utcnow()}}
+    if price is not None:
+        push = {f"prices.{ALL_SIZES}": {"$each": [float(price)], "$slice": -SUPPLIER_STATS_PRICE_SAMPLES}}
+        key = _size_key(size)
+        if key:
+            push[f"prices.{key}"] = {"$each": [float(price)], "$slice": -SUPPLIER_STATS_PRICE_SAMPLES}
+        update["$push"] = push
+    return update
+
+
+def record_outcome(task: dict, supplier: dict, outcome: str, offer: dict | None = None):
+    """Registra o fim de um contato (accepted | rejected | no_answer | timeout | skipped) sem bloquear."""
+    sid, stype = (supplier or {}).get("id"), (task or {}).get("service_type")
+    if not sid or not stype or outcome not in OUTCOMES:
+        return
+    price = (offer or {}).get("price") if outcome == "accepted" else None
+    writer.upsert("supplier_stats", {"supplier_id": sid, "service_type": stype},
+                  stats_update(outcome, price, task.get("size")))
+    tracer.inc("supplier_outcomes_total", outcome=outcome)
+
+
+def contacts(doc: dict | None) -> int:
+    outcomes = (doc or {}).get("outcomes") or {}
+    return sum(outcomes.get(k, 0) for k in CONTACTED)
+
+
+def acceptance(doc: dict | None, prior: float = 0.5, weight: float = SUPPLIER_STATS_PRIOR) -> float:
+    """Taxa de aceite suavizada: sem histórico vale `prior`, e poucos contatos pesam pouco."""
+    accepted = ((doc or {}).get("outcomes") or {}).get("accepted", 0)
+    return (accepted + prior * weight) / (contacts(doc) + weight)
+
+
+def median_price(doc: dict | None, size: str | None = None) -> float | None:
+    """Mediana das últimas cotações do tamanho pedido (ou de todas, se o tamanho não tiver amostra)."""
+    prices = (doc or {}).get("prices") or {}
+    sample = prices.get(_size_key(size) or ALL_SIZES) or prices.get(ALL_SIZES)
+    return median(sample) if sample else None
+
+
+def typical_outcome(doc: dict | None) -> str | None:
+    outcomes = (doc or {}).get("outcomes") or {}
+    return max(outcomes, key=outcomes.get) if outcomes else None
+
+
+class SupplierStats:
+    """Leitura de `supplier_stats` por service_type, com cache por TTL como o catálogo de fornecedores."""
+
+    def __init__(self, ttl: float = SUPPLIER_STATS_TTL):
+        self.ttl = ttl
+        self._cache: dict[str, tuple[float, dict[str, dict]]] = {}
+        self._lock = threading.Lock()
+
+    def for_service(self, service_type: str | None) -> dict[str, dict]:
+        """{supplier_id: documento}. Se o Mongo falhar, segue com o último valor lido (ou vazio)."""
+        hit = self._cache.get(service_type or "")
+        if hit is not None and self.ttl and time.monotonic() - hit[0] < self.ttl:
+            return hit[1]
+        try:
+            with tracer.span("mongo", "supplier_stats.find"):
+                docs = {d["supplier_id"]: d for d in db.supplier_stats.find({"service_type": service_type}, {"_id": 0})}
+        except Exception as e:
+            log.warning("could not load supplier stats for %s: %s", service_type, e)
+            return hit[1] if hit else {}
+        with self._lock:
+            self._cache[service_type or ""] = (time.monotonic(), docs)
+        return docs
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+
+stats = SupplierStats()
+
+
+def backfill_from_offers() -> int:
+    """
+    Preenche `supplier_stats` (vazia) com os aceites e preços já gravados em `offers`.
+    Recusas e silêncio nunca foram gravados lá; esses contadores começam do zero.
+    """
+    if db.supplier_stats.count_documents({}):
+        raise RuntimeError("supplier_stats is not empty; backfill would double count")
+    updates: dict[tuple, dict] = {}
+    for o in db.offers.find({}, {"supplier.id": 1, "task": 1, "offer.price": 1}).sort("created_at", 1):
+        sid, task = (o.get("supplier") or {}).get("id"), o.get("task") or {}
+        if not sid or not task.get("service_type"):
+            continue
+        key = (sid, task["service_type"])
+        upd = updates.setdefault(key, {"accepted": 0, "prices": {}})
+        upd["accepted"] += 1
+        price = (o.get("offer") or {}).get("price")
+        if price is not None:
+            for k in {ALL_SIZES, _size_key(task.get("size")) or ALL_SIZES}:
+                upd["prices"].setdefault(k, []).append(float(price))
+    now = datetime.utcnow()
+    for (sid, stype), upd in updates.items():
+        db.supplier_stats.update_one({"supplier_id": sid, "service_type": stype}, {
+            "$set": {"outcomes": {"accepted": upd["accepted"]}, "last_outcome": "accepted", "updated_at": now,
+                     "prices": {k: v[-SUPPLIER_STATS_PRICE_SAMPLES:] for k, v in upd["prices"].items()}},
+        }, upsert=True)
+    return len(updates)
+
+
+def main(argv: list[str]):
+    if "--backfill" in argv:
+        print(f"backfilled {backfill_from_offers()} supplier(s)")
+        return
+    rows = sorted(db.supplier_stats.find({}, {"_id": 0}), key=lambda d: (d["service_type"], -acceptance(d)))
+    print(f"{'service_type':<16}{'supplier':<10}{'contacts':>9}{'accept':>8}{'median':>9}  typical")
+    for d in rows:
+        price = median_price(d)
+        print(f"{d['service_type']:<16}{d['supplier_id']:<10}{contacts(d):>9}{acceptance(d):>8.2f}"
+              f"{'-' if price is None else f'{price:.2f}':>9}  {typical_outcome(d) or '-'}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,359 @@
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from db.mongo import db
+from tracing import tracer
+
+PERSIST_QUEUE_SIZE = int(os.getenv("PERSIST_QUEUE_SIZE", "10000"))
+PERSIST_BATCH_SIZE = int(os.getenv("PERSIST_BATCH_SIZE", "200"))
+PERSIST_FLUSH_INTERVAL = float(os.getenv("PERSIST_FLUSH_INTERVAL", "0.5"))   # segundos
+PERSIST_MAX_RETRIES = int(os.getenv("PERSIST_MAX_RETRIES", "5"))
+PERSIST_DEADLETTER_PATH = os.getenv("PERSIST_DEADLETTER_PATH", "failed_writes.jsonl")
+
+log = logging.getLogger("quote.persist")
+
+ASCENDING, DESCENDING = 1, -1   # mesmos valores de pymongo.ASCENDING/DESCENDING, sem importar o pymongo
+MERGEABLE_OPS = {"$set", "$setOnInsert", "$inc", "$push"}
+
+# (chaves, opções). quotes.run_id é único: um orçamento por execução, gravado por upsert. O índice é
+# parcial (só run_id string): orçamentos sem run_id são inseridos normalmente e não colidem entre si.
+INDEXES = {
+    "offers": [
+        ([("run_id", ASCENDING), ("supplier.id", ASCENDING)], {}),
+        ([("created_at", DESCENDING)], {}),
+    ],
+    "quotes": [
+        ([("run_id", ASCENDING)], {"unique": True, "partialFilterExpression": {"run_id": {"$type": "string"}}}),
+        ([("created_at", DESCENDING)], {}),
+    ],
+    "supplier_stats": [
+        ([("supplier_id", ASCENDING), ("service_type", ASCENDING)], {"unique": True}),
+        ([("service_type", ASCENDING)], {}),
+    ],
+    # Um índice composto só pode ter um campo array por documento ("parallel arrays"): em vez de
+    # (service_type, cores, tamanhos, dias), um par (service_type, <array>) por filtro; o planner
+    # usa o mais seletivo e confere os demais campos no documento.
+    "suppliers": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("service_type", ASCENDING), ("id", ASCENDING)], {}),
+        ([("service_type", ASCENDING), ("inventory.colors", ASCENDING)], {}),
+        ([("service_type", ASCENDING), ("inventory.sizes", ASCENDING)], {}),
+        ([("service_type", ASCENDING), ("working_days", ASCENDING)], {}),
+    ],
+}
+
+INDEX_OPTIONS_CONFLICT = {85, 86}   # IndexOptionsConflict / IndexKeySpecsConflict
+
+
+def ensure_indexes():
+    for col, specs in INDEXES.items():
+        for keys, opts in specs:
+            try:
+                try:
+                    db[col].create_index(keys, **opts)
+                except Exception as e:
+                    if getattr(e, "code", None) not in INDEX_OPTIONS_CONFLICT and "different options" not in str(e):
+                        raise
+                    # mesmo índice com opções antigas (ex.: quotes.run_id único sem filtro parcial): recria
+                    log.warning("recreating index %s on %s with new options", keys, col)
+                    db[col].drop_index(keys)
+                    db[col].create_index(keys, **opts)
+            except Exception as e:
+                # ex.: quotes duplicados de versões antigas impedem o índice único (ver --dedupe-quotes)
+                log.warning("could not create index %s on %s: %s", keys, col, e)
+
+
+def dedupe_quotes() -> int:
+    """Mantém só o orçamento mais recente de cada run_id; necessário antes do índice único."""
+    removed = 0
+    for group in db.quotes.aggregate([
+        {"$match": {"run_id": {"$type": "string"}}},   # orçamentos sem run_id não são duplicatas entre si
+        {"$sort": {"created_at": -1}},
+        {"$group": {"_id": "$run_id", "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}},
+    ]):
+        removed += db.quotes.delete_many({"_id": {"$in": group["ids"][1:]}}).deleted_count
+    return removed
+
+
+class WriteBehindWriter:
+    """
+    Persistência assíncrona: a requisição só enfileira o documento; uma thread
+    agrupa por coleção e grava com insert_many (upserts com update_one). Fila limitada (backpressure),
+    retry com backoff e, se ainda assim falhar, o documento vai para um arquivo
+    dead-letter (JSONL) que pode ser reprocessado com `python -m db.writer --replay`.
+    """
+
+    def __init__(self, max_queue: int = PERSIST_QUEUE_SIZE, batch_size: int = PERSIST_BATCH_SIZE,
+                 flush_interval: float = PERSIST_FLUSH_INTERVAL, max_retries: int = PERSIST_MAX_RETRIES,
+                 deadletter_path: str = PERSIST_DEADLETTER_PATH):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.deadletter_path = deadletter_path
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "retries": 0, "deadlettered": 0}
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="persist-writer", daemon=True)
+                self._thread.start()
+
+    def insert(self, collection: str, doc: dict, timeout: float | None = None):
+        """Enfileira; bloqueia se a fila estiver cheia (até `timeout`, depois queue.Full)."""
+        self._ensure_started()
+        self._queue.put((collection, doc, None), timeout=timeout)
+        self.stats["enqueued"] += 1
+
+    def upsert(self, collection: str, filter: dict, update: dict, timeout: float | None = None):
+        """
+        Enfileira um update_one(filter, update, upsert=True). Regravar o mesmo filtro atualiza
+        o documento em vez de duplicar ($set substitui; $inc/$push acumulam).
+        """
+        self._ensure_started()
+        self._queue.put((collection, update, filter), timeout=timeout)
+        self.stats["enqueued"] += 1
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Espera a fila esvaziar (tudo gravado ou em dead-letter)."""
+        if self._thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float | None = 10.0):
+        self.flush(timeout)
+        self._stop.set()
+
+    def _run(self):
+        from bson import json_util
+        ensure_indexes()
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            by_col: dict[str, list[dict]] = {}
+            upserts: dict[tuple, tuple[str, dict, list[dict]]] = {}
+            for col, doc, filt in batch:
+                if filt is None:
+                    by_col.setdefault(col, []).append(doc)
+                else:
+                    # Vários upserts do mesmo filtro no lote: aplica só o resultado combinado, na ordem.
+                    key = (col, json_util.dumps(filt, sort_keys=True))
+                    _, _, updates = upserts.setdefault(key, (col, filt, []))
+                    merged = _merge_updates(updates[-1], doc) if updates else None
+                    if merged is None:
+                        updates.append(doc)
+                    else:
+                        updates[-1] = merged
+            try:
+                for col, docs in by_col.items():
+                    self._write(col, docs)
+                for col, filt, updates in upserts.values():
+                    for update in updates:
+                        self._upsert(col, filt, update)
+            except Exception:
+                log.exception("persist writer failed on a batch of %d document(s)", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, collection: str, docs: list[dict]):
+        from pymongo.errors import BulkWriteError
+        pending = docs
+        for attempt in range(self.max_retries + 1):
+            try:
+                with tracer.span("mongo", f"{collection}.insert_many", docs=len(pending)):
+                    db[collection].insert_many(pending, ordered=False)
+                self.stats["written"] += len(pending)
+                self.stats["batches"] += 1
+                return
+            except BulkWriteError as e:
+                # insert_many atribui _id antes de enviar: _id duplicado = já gravado numa tentativa anterior.
+                # Duplicado em outro índice único não se resolve com retry: vai direto para o dead-letter.
+                failed, rejected = set(), []
+                for err in e.details.get("writeErrors", []):
+                    if err.get("code") != 11000:
+                        failed.add(err["index"])
+                    elif not _is_id_duplicate(collection, err, pending[err["index"]]):
+                        rejected.append(pending[err["index"]])
+                self.stats["written"] += len(pending) - len(failed) - len(rejected)
+                if rejected:
+                    self._deadletter(collection, rejected)
+                pending = [d for i, d in enumerate(pending) if i in failed]
+                if not pending:
+                    return
+            except Exception as e:
+                log.warning("insert_many on %s failed (attempt %d): %s", collection, attempt + 1, e)
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                time.sleep(min(0.2 * (2 ** attempt), 10.0))
+        self._deadletter(collection, pending)
+
+    def _upsert(self, collection: str, filter: dict, update: dict):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with tracer.span("mongo", f"{collection}.upsert"):
+                    db[collection].update_one(filter, update, upsert=True)
+                self.stats["written"] += 1
+                return
+            except Exception as e:
+                # Inclui DuplicateKeyError de dois upserts simultâneos: na próxima tentativa o documento já existe.
+                log.warning("upsert on %s failed (attempt %d): %s", collection, attempt + 1, e)
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                time.sleep(min(0.2 * (2 ** attempt), 10.0))
+        self._deadletter(collection, [update], filter)
+
+    def _deadletter(self, collection: str, docs: list[dict], filter: dict | None = None):
+        from bson import json_util
+        log.error("giving up on %d document(s) for %s; saved to %s", len(docs), collection, self.deadletter_path)
+        with open(self.deadletter_path, "a", encoding="utf-8") as f:
+            for d in docs:
+                item = {"collection": collection, "doc": d}
+                if filter is not None:
+                    item["filter"] = filter
+                f.write(json_util.dumps(item) + "\n")
+        self.stats["deadlettered"] += len(docs)
+
+
+def _is_id_duplicate(collection: str, err: dict, doc: dict) -> bool:
+    """O erro 11000 de um insert foi no _id (documento já gravado) e não em outro índice único?"""
+    if err.get("keyPattern"):
+        return set(err["keyPattern"]) == {"_id"}
+    if "index: " in (err.get("errmsg") or ""):
+        return "index: _id_ " in err["errmsg"]
+    # sem detalhes do índice (ex.: mongomock): confere se o _id já está no banco
+    return "_id" in doc and db[collection].find_one({"_id": doc["_id"]}, {"_id": 1}) is not None
+
+
+def _merge_updates(first: dict, second: dict) -> dict | None:
+    """
+    Combina dois updates como se fossem aplicados em sequência: $set (o último vence),
+    $setOnInsert (só o do primeiro), $inc (soma) e $push com $each/$slice (concatena).
+    None quando não dá para combinar; aí os dois são aplicados um depois do outro.
+    """
+    if set(first) - MERGEABLE_OPS or set(second) - MERGEABLE_OPS:
+        return None
+    merged = {"$set": {**first.get("$set", {}), **second.get("$set", {})}}
+    # só o primeiro update pode inserir o documento; o $setOnInsert dos seguintes nunca se aplica
+    on_insert = {k: v for k, v in first.get("$setOnInsert", {}).items() if k not in merged["$set"]}
+    if on_insert:
+        merged["$setOnInsert"] = on_insert
+    inc = dict(first.get("$inc", {}))
+    for k, v in second.get("$inc", {}).items():
+        inc[k] = inc.get(k, 0) + v
+    if inc:
+        merged["$inc"] = inc
+    push = dict(first.get("$push", {}))
+    for k, v in second.get("$push", {}).items():
+        prev = push.get(k)
+        if prev is None:
+            push[k] = v
+        elif isinstance(prev, dict) and isinstance(v, dict) and prev.keys() <= {"$each", "$slice"} \
+                and v.keys() <= {"$each", "$slice"} and prev.get("$slice") == v.get("$slice"):
+            push[k] = {**prev, "$each": prev.get("$each", []) + v.get("$each", [])}
+        else:
+            return None
+    if push:
+        merged["$push"] = push
+    if not merged["$set"]:
+        del merged["$set"]
+    return merged
+
+
+def replay_deadletter(path: str = PERSIST_DEADLETTER_PATH) -> int:
+    """
+    Regrava no Mongo o conteúdo do dead-letter. Cada entrada é aplicada uma vez: o arquivo é
+    reescrito só com o que falhou de novo (e removido se nada sobrar), para que um novo --replay
+    não reaplique upserts com $inc. Inserts rejeitados por duplicata fora do _id (foram para o
+    dead-letter por isso) são descartados com aviso em vez de travar o arquivo para sempre.
+    """
+    from bson import json_util
+    from pymongo.errors import BulkWriteError
+    if not os.path.exists(path):
+        return 0
+    inserts: dict[str, list[dict]] = {}
+    upserts: list[dict] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json_util.loads(line)
+                if "filter" in item:
+                    upserts.append(item)
+                else:
+                    inserts.setdefault(item["collection"], []).append(item["doc"])
+
+    total, skipped, remaining = 0, 0, []
+    for col, docs in inserts.items():
+        failed: set[int] = set()
+        dropped = 0
+        try:
+            db[col].insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                if err.get("code") != 11000:
+                    failed.add(err["index"])
+                elif not _is_id_duplicate(col, err, docs[err["index"]]):
+                    dropped += 1
+        except Exception as e:
+            log.warning("replay of %d document(s) for %s failed: %s", len(docs), col, e)
+            failed = set(range(len(docs)))
+        total += len(docs) - len(failed) - dropped
+        skipped += dropped
+        remaining += [{"collection": col, "doc": d} for i, d in enumerate(docs) if i in failed]
+    for item in upserts:
+        try:
+            db[item["collection"]].update_one(item["filter"], item["doc"], upsert=True)
+            total += 1
+        except Exception as e:
+            log.warning("replay of upsert on %s failed: %s", item["collection"], e)
+            remaining.append(item)
+
+    if skipped:
+        log.warning("dropped %d document(s) that duplicate a unique key other than _id", skipped)
+    if remaining:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for item in remaining:
+                f.write(json_util.dumps(item) + "\n")
+        os.replace(tmp, path)
+    else:
+        os.remove(path)
+    return total
+
+
+writer = WriteBehindWriter()
+atexit.register(writer.close)
+
+if __name__ == "__main__":
+    if "--replay" in sys.argv:
+        print(f"replayed {replay_deadletter()} document(s)")
+    elif "--ensure-indexes" in sys.argv:
+        ensure_indexes()
+        print("indexes ok")
+    elif "--dedupe-quotes" in sys.argv:
+        print(f"removed {dedupe_quotes()} duplicate quote(s)")
+    else:
+        print("usage: python -m db.writer [--replay | --ensure-indexes | --dedupe-quotes]")
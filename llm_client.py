@@ -1,13 +1,179 @@
+import contextlib
 import os
+import random
+import threading
+import time
+from typing import Iterator
 from dotenv import load_dotenv
-from langchain_community.chat_models import ChatOllama
-from langchain_core.messages import SystemMessage, HumanMessage
+from llm_cache import LLMCache, cache_key, default_cache
+from tracing import tracer
 load_dotenv()
+
+OLLAMA_TIMEOUT = int(os.getenv("OLLAMA_TIMEOUT", "120"))              # segundos por requisição
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")             # mantém o modelo carregado entre chamadas
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))      # chamadas simultâneas ao Ollama
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "0.5"))      # segundos; dobra a cada tentativa
+
+def _approx_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
 class LLMClient:
-    def __init__(self, model: str | None = None):
+    def __init__(self, model: str | None = None, cache: LLMCache | None = default_cache,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY, timeout: int = OLLAMA_TIMEOUT,
+                 max_retries: int = LLM_MAX_RETRIES, backoff: float = LLM_RETRY_BACKOFF):
         self.model = model or os.getenv("OLLAMA_MODEL", "llama3")
-        base_url = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-        self.client = ChatOllama(model=self.model, base_url=base_url)
-    def ask(self, system_prompt: str, user_prompt: str) -> str:
-        resp = self.client.invoke([SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)])
-        return resp.content.strip()
+        self.base_url = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+        self.timeout = timeout
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # Um limite só para ask, stream e aask (de qualquer thread ou event loop): no máximo
+        # max_concurrency requisições ao Ollama por cliente, e o cliente é único por processo.
+        self._sem = threading.BoundedSemaphore(max_concurrency)
+
+    @property
+    def client(self):
+        # langchain_community demora ~1s para importar: só carrega na primeira chamada à LLM
+        # (respostas do cache e caminhos determinísticos nunca pagam esse custo).
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from langchain_community.chat_models import ChatOllama
+                    self._client = ChatOllama(model=self.model, base_url=self.base_url, timeout=self.timeout,
+                                              keep_alive=OLLAMA_KEEP_ALIVE)
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    def _messages(self, system_prompt: str, user_prompt: str) -> list:
+        from langchain_core.messages import SystemMessage, HumanMessage
+        return [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)]
+
+    def _cache_lookup(self, system_prompt: str, user_prompt: str, use_cache: bool) -> tuple[str | None, str | None]:
+        if not use_cache or self.cache is None:
+            return None, None
+        key = cache_key(self.model, system_prompt, user_prompt)
+        hit = self.cache.get(key)
+        tracer.inc("quote_llm_cache_total", result="hit" if hit is not None else "miss")
+        if hit is not None:
+            tracer.event("llm", "cache_hit", model=self.model, prompt_chars=len(system_prompt) + len(user_prompt))
+        return key, hit
+
+    def _record_usage(self, span: dict, resp, prompt: str, out: str, attempts: int):
+        # Ollama devolve as contagens reais; sem elas, estimativa de ~4 caracteres por token.
+        meta = getattr(resp, "response_metadata", None) or {}
+        prompt_tokens = meta.get("prompt_eval_count") or _approx_tokens(prompt)
+        completion_tokens = meta.get("eval_count") or _approx_tokens(out)
+        span.update(model=self.model, attempts=attempts,
+                    prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        tracer.inc("quote_llm_prompt_tokens_total", prompt_tokens, model=self.model)
+        tracer.inc("quote_llm_completion_tokens_total", completion_tokens, model=self.model)
+
+    def _delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt) * (1 + random.random() * 0.25)
+
+    @contextlib.asynccontextmanager
+    async def _async_slot(self):
+        """
+        Vaga no mesmo semáforo de ask/stream. Sem vaga livre, tenta de novo após um asyncio.sleep curto
+        (até 50 ms) em vez de bloquear o event loop; cancelar a espera não deixa vaga presa.
+        """
+        import asyncio
+        delay = 0.002
+        while not self._sem.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        try:
+            yield
+        finally:
+            self._sem.release()
+
+    def ask(self, system_prompt: str, user_prompt: str, use_cache: bool = True) -> str:
+        key, hit = self._cache_lookup(system_prompt, user_prompt, use_cache)
+        if hit is not None:
+            return hit
+        messages = self._messages(system_prompt, user_prompt)
+        with tracer.span("llm", "ask") as span:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    with self._sem:
+                        resp = self.client.invoke(messages)
+                    break
+                except Exception:
+                    if attempt == self.max_retries:
+                        raise
+                    time.sleep(self._delay(attempt))
+            out = resp.content.strip()
+            self._record_usage(span, resp, system_prompt + user_prompt, out, attempt + 1)
+        if key is not None and out:
+            self.cache.set(key, out)
+        return out
+
+    def stream(self, system_prompt: str, user_prompt: str, use_cache: bool = True) -> Iterator[str]:
+        """Gera os pedaços da resposta conforme o Ollama produz (ou a resposta inteira, se vier do cache)."""
+        key, hit = self._cache_lookup(system_prompt, user_prompt, use_cache)
+        if hit is not None:
+            yield hit
+            return
+        messages = self._messages(system_prompt, user_prompt)
+        parts: list[str] = []
+        with tracer.span("llm", "stream") as span:
+            t0 = time.perf_counter()
+            for attempt in range(self.max_retries + 1):
+                try:
+                    with self._sem:
+                        for chunk in self.client.stream(messages):
+                            if chunk.content:
+                                if not parts:
+                                    span["ttft_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+                                parts.append(chunk.content)
+                                yield chunk.content
+                    break
+                except Exception:
+                    # Só dá para repetir se nada foi entregue ainda.
+                    if parts or attempt == self.max_retries:
+                        raise
+                    time.sleep(self._delay(attempt))
+            out = "".join(parts).strip()
+            self._record_usage(span, None, system_prompt + user_prompt, out, attempt + 1)
+        if key is not None and out:
+            self.cache.set(key, out)
+
+    async def aask(self, system_prompt: str, user_prompt: str, use_cache: bool = True) -> str:
+        import asyncio
+        key, hit = self._cache_lookup(system_prompt, user_prompt, use_cache)
+        if hit is not None:
+            return hit
+        messages = self._messages(system_prompt, user_prompt)
+        with tracer.span("llm", "aask") as span:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    async with self._async_slot():
+                        resp = await self.client.ainvoke(messages)
+                    break
+                except Exception:
+                    if attempt == self.max_retries:
+                        raise
+                    await asyncio.sleep(self._delay(attempt))
+            out = resp.content.strip()
+            self._record_usage(span, resp, system_prompt + user_prompt, out, attempt + 1)
+        if key is not None and out:
+            self.cache.set(key, out)
+        return out
+
+_shared: LLMClient | None = None
+_shared_lock = threading.Lock()
+
+def get_llm_client() -> LLMClient:
+    """Cliente único por processo: todos os nós dividem o mesmo ChatOllama e o mesmo limite de concorrência."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LLMClient()
+        return _shared
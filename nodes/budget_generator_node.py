@@ -1,6 +1,16 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
 
-from db.mongo import db
+from db.writer import writer
+
+BUDGET_MEMO_SIZE = int(os.getenv("BUDGET_MEMO_SIZE", "1024"))   # orçamentos lembrados (run_id + ofertas)
+
+def offers_hash(offers: list[dict]) -> str:
+    return hashlib.sha256(json.dumps(offers, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
 
 def _brl(v):
     try:
@@ -15,9 +25,31 @@ def _ddmmyyyy(s):
         return s or '-'
 
 class BudgetGeneratorNode:
+    """
+    Monta a mensagem final e grava em `quotes`. Memoizado por (run_id, hash das ofertas):
+    reruns do Streamlit com as mesmas ofertas não refazem nem regravam nada, e a gravação
+    é um upsert por run_id (um documento por execução).
+    """
+
+    def __init__(self, memo_size: int = BUDGET_MEMO_SIZE):
+        self.memo_size = memo_size
+        self._memo: OrderedDict[tuple, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
     def run(self, data: dict) -> dict:
         offers = data.get('offers', [])
         task = data.get('task', {})
+        run_id = task.get("run_id")
+        key = (run_id, offers_hash(offers)) if run_id else None
+        if key is not None:
+            with self._lock:
+                hit = self._memo.get(key)
+                if hit is not None:
+                    self._memo.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return dict(hit)
+        self.stats["misses"] += 1
 
         intro = 'Olá! Seguem as opções que atendem ao seu pedido:'
         lines = []
@@ -36,15 +68,25 @@ class BudgetGeneratorNode:
         outro = 'Deseja seguir com alguma dessas opções ou quer que eu verifique mais fornecedores?'
         full_message = intro + '\n\n' + '\n'.join(lines) + '\n\n' + outro
 
-        try:
-            db.quotes.insert_one({
-                "run_id": task.get("run_id"),
-                "created_at": datetime.utcnow(),
+        now = datetime.utcnow()
+        if key is None:
+            writer.insert("quotes", {
+                "run_id": run_id,
+                "created_at": now,
                 "task": task,
                 "offers": offers,
                 "message": full_message
             })
-        except Exception:
-            pass
+        else:
+            writer.upsert("quotes", {"run_id": run_id}, {
+                "$set": {"task": task, "offers": offers, "message": full_message, "updated_at": now},
+                "$setOnInsert": {"created_at": now},
+            })
 
-        return {'message': full_message}
+        out = {'message': full_message}
+        if key is not None:
+            with self._lock:
+                self._memo[key] = out
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return dict(out)
@@ -1,4 +1,9 @@
-from llm_client import LLMClient
+import logging
+import os
+import re
+from categories import registry
+from llm_client import get_llm_client
+from nodes.intent_model import load_intent_model
 
 MANUAL_HINTS = [
     "torneira", "encanador", "hidrául", "hidraul", "pia", "cano",
@@ -8,21 +13,81 @@ CLOTHING_HINTS = [
     "camisa", "camiseta", "t-shirt", "tshirt", "blusa",
     "calça", "calca", "pants", "roupa", "tamanho", "cor",
 ]
+# Termos genéricos: contam meio ponto (ex.: "cor" aparece em "corrigir", "conserto" vale p/ qualquer coisa).
+WEAK_HINTS = {"registro", "conserto", "roupa", "tamanho", "cor"}
 
-class ClassifierNode:
-    def __init__(self):
-        self.llm = LLMClient()
+# "llm": sempre consulta a LLM (comportamento antigo).
+# "heuristic_first": o scorer decide sozinho quando a confiança >= CLASSIFIER_MIN_CONFIDENCE.
+CLASSIFIER_MODE = os.getenv("CLASSIFIER_MODE", "heuristic_first")
+CLASSIFIER_MIN_CONFIDENCE = float(os.getenv("CLASSIFIER_MIN_CONFIDENCE", "0.75"))
+# Modelo local (train_intent.py): decide quando a heurística não decidiu e a probabilidade passa do limite.
+INTENT_MODEL_MIN_PROBA = float(os.getenv("INTENT_MODEL_MIN_PROBA", "0.9"))
+
+log = logging.getLogger("quote.classifier")
+
+def _hint_regex(hints: list[str]) -> re.Pattern:
+    alts = "|".join(re.escape(h) for h in sorted(hints, key=len, reverse=True))
+    return re.compile(rf"\b({alts})\w*", re.IGNORECASE)
+
+_MANUAL_RE = _hint_regex(MANUAL_HINTS)
+_CLOTHING_RE = _hint_regex(CLOTHING_HINTS)
+
+def _score_hits(rx: re.Pattern, text: str) -> float:
+    return sum(0.5 if m.group(1).lower() in WEAK_HINTS else 1.0 for m in rx.finditer(text))
 
-    def _heuristic(self, text: str) -> str:
-        t = (text or "").lower()
-        if any(k in t for k in MANUAL_HINTS):
-            return "manual_process"
-        if any(k in t for k in CLOTHING_HINTS):
-            return "clothing"
-        return "manual_process"  
+def keyword_category(text: str) -> str:
+    t = (text or "").lower()
+    if any(k in t for k in MANUAL_HINTS):
+        return "manual_process"
+    if any(k in t for k in CLOTHING_HINTS):
+        return "clothing"
+    return "manual_process"
+
+def keyword_score(text: str) -> tuple[str, float]:
+    """
+    Retorna (label, confiança 0..1) só com palavras-chave, sem LLM nem modelo.
+    Confiança = margem entre os dois lados, limitada pelo peso do lado vencedor
+    (um único termo fraco nunca passa de 0.5; sem termos = 0).
+    """
+    t = text or ""
+    manual = _score_hits(_MANUAL_RE, t)
+    clothing = _score_hits(_CLOTHING_RE, t)
+    top, low = max(manual, clothing), min(manual, clothing)
+    if top == 0:
+        return keyword_category(t), 0.0
+    label = "manual_process" if manual >= clothing else "clothing"
+    confidence = ((top - low) / (top + low)) * min(1.0, top)
+    return label, round(confidence, 3)
+
+class ClassifierNode:
+    def __init__(self, mode: str | None = None, min_confidence: float | None = None,
+                 model_path: str | None = None, model_min_proba: float | None = None):
+        self.llm = get_llm_client()
+        self.mode = mode or CLASSIFIER_MODE
+        self.min_confidence = CLASSIFIER_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        self.model = load_intent_model(model_path)   # None sem modelo treinado
+        if self.model is not None and not self.model.covers_registry():
+            # treinado sem alguma categoria: daria ~100% para o que conhece e pularia a LLM
+            log.warning("ignoring intent model: categories %s do not match the registry %s",
+                        sorted(self.model.categories()), sorted(registry.categories))
+            self.model = None
+        self.model_min_proba = INTENT_MODEL_MIN_PROBA if model_min_proba is None else model_min_proba
+        self.stats = {"heuristic": 0, "model": 0, "llm": 0, "llm_error": 0}
 
     def run(self, task_text: str) -> dict:
-        label = self._heuristic(task_text)
+        label, confidence = keyword_score(task_text)
+
+        if self.mode != "llm" and confidence >= self.min_confidence:
+            self.stats["heuristic"] += 1
+            return {"category": label, "original_task": task_text,
+                    "classifier_path": "heuristic", "classifier_confidence": confidence}
+
+        if self.mode != "llm" and self.model is not None:
+            category, proba = self.model.predict_category(task_text)
+            if category and proba >= self.model_min_proba:
+                self.stats["model"] += 1
+                return {"category": category, "original_task": task_text,
+                        "classifier_path": "model", "classifier_confidence": round(proba, 3)}
 
         sys = (
             "Return ONLY one label: 'manual_process' or 'clothing'. "
@@ -30,11 +95,16 @@ class ClassifierNode:
             "If the task mentions shirts, pants, clothing, sizes or colors, choose 'clothing'. "
             "Do not rewrite the task. Output ONLY the label."
         )
+        path = "llm"
         try:
             out = self.llm.ask(sys, f"Task: {task_text}").strip().lower()
-            if out in {"manual_process", "clothing"}:
+            if out in registry.categories:
                 label = out
+            else:
+                path = "llm_invalid"
         except Exception:
-            pass
+            path = "llm_error"
+        self.stats["llm" if path != "llm_error" else "llm_error"] += 1
 
-        return {"category": label, "original_task": task_text}
+        return {"category": label, "original_task": task_text,
+                "classifier_path": path, "classifier_confidence": confidence}
@@ -1,16 +1,8 @@
 import json
 import re
-from llm_client import LLMClient
-
-SIZE_PATTERNS = [
-    r"\btam(?:anho)?\s*[:\-]?\s*([x]{0,3}g{1,2}|pp|p|m|g|gg|xg|xxg|xgg|xggg|xl|xxl|xxxl)\b",
-    r"\b([x]{0,3}g{1,2}|pp|p|m|g|gg|xg|xxg|xgg|xggg|xl|xxl|xxxl)\b",
-    r"\btam(?:anho)?\s*[:\-]?\s*(\d{2})\b",
-    r"\b(\d{2})\b",
-]
-COLOR_PATTERNS = [
-    r"\b(preto|preta|branco|branca|azul|vermelh[oa]|verde|amarel[oa]|cinza|rosa|roxo|marrom|bege|lil[aá]s|vinho|bord[oó])\b"
-]
+from categories import registry
+from llm_client import get_llm_client
+from nodes.text_extract import find_color, find_size, is_pants
 
 def _normalize_size(s: str | None) -> str | None:
     if not s:
@@ -49,33 +41,16 @@ def _regex_extract(text: str) -> tuple[str | None, str | None, str]:
     Retorna (color, size, service_type)
     service_type: 'tshirt_sale' se falar camisa/camiseta; 'pants_sale' se falar calça; default 'tshirt_sale'
     """
-    t = (text or "").lower()
-
-    if re.search(r"\b(cal[cç]a|pants)\b", t):
-        service_type = "pants_sale"
-    else:
-        service_type = "tshirt_sale"
-
-    size_found = None
-    for pat in SIZE_PATTERNS:
-        m = re.search(pat, t, flags=re.IGNORECASE)
-        if m:
-            size_found = _normalize_size(m.group(1))
-            break
-
-    color_found = None
-    for pat in COLOR_PATTERNS:
-        m = re.search(pat, t, flags=re.IGNORECASE)
-        if m:
-            color_found = _normalize_color(m.group(1))
-            break
+    service_type = "pants_sale" if is_pants(text) else "tshirt_sale"
+    size_found = _normalize_size(find_size(text))
+    color_found = _normalize_color(find_color(text))
 
     return color_found, size_found, service_type
 
 
 class ClothingNormalizerNode:
     def __init__(self):
-        self.llm = LLMClient()
+        self.llm = get_llm_client()
 
     def run(self, task_text: str, current_date: str | None = None) -> dict:
         sys = (
@@ -119,7 +94,7 @@ class ClothingNormalizerNode:
 
         if llm_data and isinstance(llm_data, dict):
             stype = llm_data.get("service_type")
-            if stype in {"tshirt_sale", "pants_sale"}:
+            if stype in registry.service_types_of("clothing"):
                 data["service_type"] = stype
             else:
                 data["service_type"] = service_rx  
@@ -0,0 +1,152 @@
+"""
+Classificador de intenção local: naive Bayes multinomial sobre n-gramas de caracteres.
+
+Treinado com os pedidos já resolvidos (db.quotes: texto -> service_type) por
+`python train_intent.py`, salvo em JSON e carregado pelo ClassifierNode. Prever é
+só somar log-probabilidades de um dicionário: dezenas de microssegundos, sem LLM.
+"""
+import json
+import logging
+import math
+import os
+import re
+from datetime import datetime
+from categories import registry
+
+INTENT_MODEL_PATH = os.getenv(
+    "INTENT_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "intent_model.json"))
+
+log = logging.getLogger("quote.intent")
+
+_SPACES = re.compile(r"[^a-z0-9]+")
+_ACCENTS = str.maketrans("áàâãäéèêëíìîïóòôõöúùûüçñ", "aaaaaeeeeiiiiooooouuuucn")
+
+
+def normalize(text: str) -> str:
+    """minúsculas, sem acento e só letras/dígitos separados por um espaço."""
+    return _SPACES.sub(" ", (text or "").lower().translate(_ACCENTS)).strip()
+
+
+def coverage_errors(labels: list[str], min_per_category: int) -> list[str]:
+    """
+    O que impede treinar com estes rótulos (service_types): menos de 2 classes ou alguma categoria
+    do registro com menos de `min_per_category` exemplos. Sem isso o modelo dá probabilidade ~1
+    para a única categoria que conhece e o ClassifierNode deixaria de chamar a LLM.
+    """
+    errors = []
+    if len(set(labels)) < 2:
+        errors.append(f"{len(set(labels))} service_type(s); need at least 2")
+    per_category = {c: 0 for c in registry.categories}
+    for label in labels:
+        cat = registry.category_of(label)
+        if cat in per_category:
+            per_category[cat] += 1
+    for cat, n in per_category.items():
+        if n < min_per_category:
+            errors.append(f"category {cat}: {n} sample(s); need {min_per_category}")
+    return errors
+
+
+def char_ngrams(text: str, n_min: int = 2, n_max: int = 4) -> list[str]:
+    """n-gramas de caracteres do texto normalizado com bordas (' to', 'tor', 'orn'...), com repetição."""
+    t = f" {normalize(text)} "
+    return [t[i:i + n] for n in range(n_min, n_max + 1) for i in range(len(t) - n + 1)]
+
+
+class IntentModel:
+    def __init__(self, classes: list[str], class_log_prior: list[float], feature_log_prob: dict[str, list[float]],
+                 ngram: tuple[int, int] = (2, 4), meta: dict | None = None):
+        self.classes = classes
+        self.class_log_prior = class_log_prior
+        self.feature_log_prob = feature_log_prob
+        self.ngram = tuple(ngram)
+        self.meta = meta or {}
+
+    @classmethod
+    def fit(cls, texts: list[str], labels: list[str], alpha: float = 0.5, ngram: tuple[int, int] = (2, 4),
+            min_count: int = 1) -> "IntentModel":
+        classes = sorted(set(labels))
+        idx = {c: i for i, c in enumerate(classes)}
+        doc_counts = [0] * len(classes)
+        counts: dict[str, list[int]] = {}
+        for text, label in zip(texts, labels):
+            k = idx[label]
+            doc_counts[k] += 1
+            for gram in char_ngrams(text, *ngram):
+                counts.setdefault(gram, [0] * len(classes))[k] += 1
+        counts = {g: c for g, c in counts.items() if sum(c) >= min_count}
+        totals = [sum(c[k] for c in counts.values()) for k in range(len(classes))]
+        vocab = len(counts)
+        feature_log_prob = {g: [round(math.log((c[k] + alpha) / (totals[k] + alpha * vocab)), 5)
+                                for k in range(len(classes))] for g, c in counts.items()}
+        n = len(labels)
+        class_log_prior = [round(math.log(doc_counts[k] / n), 5) for k in range(len(classes))]
+        meta = {"trained_at": datetime.utcnow().isoformat(timespec="seconds"), "samples": n, "alpha": alpha,
+                "vocab": vocab, "class_counts": dict(zip(classes, doc_counts))}
+        return cls(classes, class_log_prior, feature_log_prob, ngram, meta)
+
+    def categories(self) -> set[str]:
+        """Categorias do registro que o modelo sabe prever."""
+        return {cat for cat in map(registry.category_of, self.classes) if cat}
+
+    def covers_registry(self) -> bool:
+        """Só vale usar o modelo se ele conhece todas as categorias do registro (e mais de uma classe)."""
+        return len(self.classes) >= 2 and self.categories() == set(registry.categories)
+
+    def predict_proba(self, text: str) -> dict[str, float]:
+        get = self.feature_log_prob.get
+        # n-gramas fora do vocabulário não informam nada; zip(*) soma por classe sem laço em Python
+        rows = [lp for lp in map(get, char_ngrams(text, *self.ngram)) if lp is not None]
+        scores = [p + sum(col) for p, col in zip(self.class_log_prior, zip(*rows))] if rows else self.class_log_prior
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        return {c: e / total for c, e in zip(self.classes, exps)}
+
+    def predict(self, text: str) -> tuple[str, float]:
+        """(service_type, probabilidade)."""
+        proba = self.predict_proba(text)
+        label = max(proba, key=proba.get)
+        return label, proba[label]
+
+    def predict_category(self, text: str) -> tuple[str | None, float]:
+        """(category, probabilidade somada dos service_types da categoria)."""
+        by_cat: dict[str, float] = {}
+        for label, p in self.predict_proba(text).items():
+            cat = registry.category_of(label)
+            if cat:
+                by_cat[cat] = by_cat.get(cat, 0.0) + p
+        if not by_cat:
+            return None, 0.0
+        cat = max(by_cat, key=by_cat.get)
+        return cat, by_cat[cat]
+
+    def save(self, path: str = INTENT_MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = {"version": 1, "ngram": list(self.ngram), "classes": self.classes,
+                   "class_log_prior": self.class_log_prior, "feature_log_prob": self.feature_log_prob,
+                   "meta": self.meta}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = INTENT_MODEL_PATH) -> "IntentModel":
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        return cls(payload["classes"], payload["class_log_prior"], payload["feature_log_prob"],
+                   tuple(payload.get("ngram", (2, 4))), payload.get("meta"))
+
+
+def load_intent_model(path: str | None = None) -> IntentModel | None:
+    """Modelo salvo por train_intent.py; None se não houver arquivo (ou ele estiver corrompido)."""
+    path = INTENT_MODEL_PATH if path is None else path
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return IntentModel.load(path)
+    except Exception as e:
+        log.warning("could not load intent model from %s: %s", path, e)
+        return None
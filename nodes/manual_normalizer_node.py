@@ -1,54 +1,20 @@
-import json, re
-from datetime import date, timedelta
-from llm_client import LLMClient
-
-WEEKDAY_MAP = {
-    "segunda": 0, "segunda-feira": 0, "seg": 0,
-    "terça": 1, "terca": 1, "terça-feira": 1, "ter": 1,
-    "quarta": 2, "quarta-feira": 2, "qua": 2,
-    "quinta": 3, "quinta-feira": 3, "qui": 3,
-    "sexta": 4, "sexta-feira": 4, "sex": 4,
-    "sábado": 5, "sabado": 5, "sáb": 5, "sab": 5,
-    "domingo": 6, "dom": 6,
-}
-
-def _next_weekday(base: date, wd: int) -> date:
-    d = (wd - base.weekday() + 7) % 7
-    return base + timedelta(days=d or 7)
+import json
+from datetime import date
+from llm_client import get_llm_client
+from nodes.text_extract import infer_time_window, relative_date
 
 class ManualNormalizerNode:
     def __init__(self):
-        self.llm = LLMClient()
+        self.llm = get_llm_client()
 
     def _infer_time_window(self, text: str) -> str | None:
-        t = (text or "").lower()
-        if any(k in t for k in ["manhã", "manha", "cedo"]):
-            return "morning"
-        if "tarde" in t:
-            return "afternoon"
-        if any(k in t for k in ["noite", "final do dia", "fim do dia"]):
-            return "evening"
-        return None
+        return infer_time_window(text)
 
     def _infer_date(self, text: str, current_date: str | None) -> str | None:
         """Faço inferência APENAS se houver termos explícitos."""
         if not current_date:
             return None
-        base = date.fromisoformat(current_date)
-        t = (text or "").lower()
-
-        if "depois de amanhã" in t or "depois de amanha" in t:
-            return (base + timedelta(days=2)).isoformat()
-        if "amanhã" in t or "amanha" in t:
-            return (base + timedelta(days=1)).isoformat()
-        if "hoje" in t:
-            return base.isoformat()
-
-        for token, wd in WEEKDAY_MAP.items():
-            if re.search(rf"\b{token}\b", t):
-                return _next_weekday(base, wd).isoformat()
-
-        return None
+        return relative_date(text, date.fromisoformat(current_date))
 
     def run(self, task_text: str, current_date: str | None = None) -> dict:
         sys = (
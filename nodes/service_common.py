@@ -1,3 +1,86 @@
-from db.mongo import db
-def list_suppliers_by_service(collection: str, service_type: str):
-    return list(db[collection].find({'service_type': service_type}, {'_id':0}))
+import os
+from categories import registry
+from db.supplier_catalog import catalog, weekday_code
+from db.supplier_stats import acceptance, contacts, median_price, stats
+
+# 1 = descarta fornecedores que não atendem (cor/tamanho/dia/turno) e ordena os demais.
+SUPPLIER_PREFILTER = os.getenv("SUPPLIER_PREFILTER", "1") not in {"0", "false", "no"}
+# 1 = ordena também pelo histórico (supplier_stats): quem mais aceita primeiro, depois o mais barato.
+SUPPLIER_STATS_RANKING = os.getenv("SUPPLIER_STATS_RANKING", "1") not in {"0", "false", "no"}
+# Sai da fila quem, depois de N contatos, aceitou menos que SUPPLIER_PRUNE_BELOW (0 desliga)
+SUPPLIER_PRUNE_MIN_CONTACTS = int(os.getenv("SUPPLIER_PRUNE_MIN_CONTACTS", "10"))
+SUPPLIER_PRUNE_BELOW = float(os.getenv("SUPPLIER_PRUNE_BELOW", "0.05"))   # taxa de aceite bruta
+# Ofertas por orçamento: o contato para ao juntar N (workflow, fan-out e UI importam daqui).
+QUOTE_MAX_OFFERS = int(os.getenv("QUOTE_MAX_OFFERS", "3"))
+
+def list_suppliers(task: dict) -> list[dict]:
+    """
+    Consulta indexada em `suppliers` com os filtros do service_type no registro
+    (data/categories.json). Sem SUPPLIER_PREFILTER, só por service_type.
+    """
+    stype = task.get("service_type")
+    if stype not in registry.service_types:
+        return []
+    return catalog.for_task(task, registry.filters_of(stype) if SUPPLIER_PREFILTER else [])
+
+def _match(wanted: str | None, available: list | None) -> float | None:
+    """1 = confirmado no cadastro, 0.5 = cadastro não informa, None = incompatível, 0 = nada pedido."""
+    if not wanted:
+        return 0.0
+    if not available:
+        return 0.5
+    return 1.0 if str(wanted).lower() in {str(a).lower() for a in available} else None
+
+def supplier_score(task: dict, supplier: dict) -> float | None:
+    """Pontua a chance de o fornecedor aceitar a tarefa; None quando ele não tem como atender."""
+    inv = supplier.get("inventory") or {}
+    checks = [
+        _match(task.get("color"), inv.get("colors")),
+        _match(task.get("size"), inv.get("sizes")),
+        _match(weekday_code(task.get("desired_date")), supplier.get("working_days")),
+    ]
+    if task.get("time_window") == "morning":
+        morning = supplier.get("supports_morning")
+        checks.append(None if morning is False else (1.0 if morning else 0.5))
+    if any(c is None for c in checks):
+        return None
+    return sum(checks)
+
+def _history_key(task: dict, history: dict[str, dict]):
+    def key(pair):
+        score, supplier = pair
+        doc = history.get(supplier.get("id"))
+        price = median_price(doc, task.get("size"))
+        # aceite arredondado: entre fornecedores de aceite parecido, decide o cadastro e depois o preço
+        return (-round(acceptance(doc), 1), -score, price if price is not None else float("inf"))
+    return key
+
+def _pruned(doc: dict | None) -> bool:
+    n = contacts(doc)
+    if not SUPPLIER_PRUNE_MIN_CONTACTS or n < SUPPLIER_PRUNE_MIN_CONTACTS:
+        return False
+    return doc.get("outcomes", {}).get("accepted", 0) / n < SUPPLIER_PRUNE_BELOW
+
+def rank_suppliers(task: dict, suppliers: list[dict], history: dict[str, dict] | None = None) -> list[dict]:
+    """
+    Remove inelegíveis e ordena por pontuação (estável: empate mantém a ordem do cadastro).
+    Com `history` ({supplier_id: doc de supplier_stats}), ordena por aceite esperado e
+    mediana de preço, e tira da fila quem quase nunca aceita.
+    """
+    scored = [(supplier_score(task, s), s) for s in suppliers]
+    eligible = [(sc, s) for sc, s in scored if sc is not None]
+    if history:
+        eligible.sort(key=_history_key(task, history))
+        kept = [(sc, s) for sc, s in eligible if not _pruned(history.get(s.get("id")))]
+        # nunca deixa a fila menor que o número de ofertas buscado: aí os podados só vão para o fim
+        eligible = kept if len(kept) >= QUOTE_MAX_OFFERS else kept + [p for p in eligible if p not in kept]
+    else:
+        eligible.sort(key=lambda p: -p[0])
+    return [s for _, s in eligible]
+
+def select_suppliers(task: dict) -> list[dict]:
+    suppliers = list_suppliers(task)
+    if not SUPPLIER_PREFILTER:
+        return suppliers
+    history = stats.for_service(task.get("service_type")) if SUPPLIER_STATS_RANKING else None
+    return rank_suppliers(task, suppliers, history)
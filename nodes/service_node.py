@@ -0,0 +1,9 @@
+from nodes.service_common import select_suppliers
+
+
+class ServiceNode:
+    """Busca de fornecedores para qualquer service_type do registro (data/categories.json)."""
+
+    def run(self, task: dict) -> dict:
+        suppliers = select_suppliers(task)
+        return {'task': task, 'suppliers': suppliers}
@@ -1,88 +1,72 @@
-import json, re
-from datetime import date, timedelta, datetime
-from llm_client import LLMClient
-from db.mongo import db
-
-WEEKDAY_MAP = {
-    "segunda": 0, "segunda-feira": 0, "seg": 0,
-    "terça": 1, "terca": 1, "terça-feira": 1, "ter": 1,
-    "quarta": 2, "quarta-feira": 2, "qua": 2,
-    "quinta": 3, "quinta-feira": 3, "qui": 3,
-    "sexta": 4, "sexta-feira": 4, "sex": 4,
-    "sábado": 5, "sabado": 5, "sáb": 5, "sab": 5,
-    "domingo": 6, "dom": 6,
-}
-
-def _next_weekday(base: date, wd: int) -> date:
-    d = (wd - base.weekday() + 7) % 7
-    return base + timedelta(days=d or 7)
-
-def _safe_date(y: int, m: int, d: int) -> str | None:
-    try:
-        return date(y, m, d).isoformat()
-    except ValueError:
-        return None
-
-def _parse_date_from_text(text: str, current_date: str | None) -> str | None:
+import json
+import os
+import re
+from datetime import datetime
+from llm_client import get_llm_client
+from db.writer import writer
+from nodes.text_extract import (has_negation, has_qualifier, infer_time_window, mentions_date, parse_date, parse_price,
+                                 yes_no_intent)
+
+_parse_date_from_text = parse_date
+
+# "rules_first": parser determinístico decide quando confiante; "llm": sempre LLM (comportamento antigo).
+ANSWER_PARSER_MODE = os.getenv("ANSWER_PARSER_MODE", "rules_first")
+ANSWER_RULES_MIN_CONFIDENCE = float(os.getenv("ANSWER_RULES_MIN_CONFIDENCE", "0.7"))
+
+def rule_parse(task: dict, answer: str) -> tuple[dict, float]:
     """
-    Suporta:
-      - YYYY-MM-DD / YYYY/MM/DD
-      - dd/mm(/aa|aaaa)  (default)
-      - mm/dd(/aa|aaaa)  (heurística quando o 2º número > 12)
-      - amanhã / hoje / depois de amanhã
-      - nomes de dias da semana
+    Interpreta respostas curtas sem LLM ("sim, R$ 80, amanhã de manhã").
+    Retorna (dados no mesmo formato do JSON da LLM, confiança 0..1).
+    Só é confiante quando intenção, preço, data e turno não se contradizem e a resposta
+    não traz ressalva ("mas", "só", "apenas") nem data que não conseguimos ler.
     """
-    t = (text or "").lower()
-    base = date.fromisoformat(current_date) if current_date else None
-
-    m_iso = re.search(r"\b(\d{4})[/-](\d{1,2})[/-](\d{1,2})\b", t)
-    if m_iso:
-        y = int(m_iso.group(1)); m = int(m_iso.group(2)); d = int(m_iso.group(3))
-        out = _safe_date(y, m, d)
-        if out: 
-            return out
-
-    m = re.search(r"\b(\d{1,2})[/-](\d{1,2})(?:[/-](\d{2,4}))?\b", t)
-    if m:
-        a = int(m.group(1))
-        b = int(m.group(2))
-        ytxt = m.group(3)
-
-        if ytxt:
-            y = int(ytxt)
-            if y < 100:  
-                y += 2000
-        else:
-            y = base.year if base else date.today().year
-
-
-        if b > 12 and a <= 12:
-            mth, day = a, b
-        else:
-            day, mth = a, b
-
-        out = _safe_date(y, mth, day)
-        if out:
-            return out
-
-    if base:
-        if "depois de amanhã" in t or "depois de amanha" in t:
-            return (base + timedelta(days=2)).isoformat()
-        if "amanhã" in t or "amanha" in t:
-            return (base + timedelta(days=1)).isoformat()
-        if "hoje" in t:
-            return base.isoformat()
-        for token, wd in WEEKDAY_MAP.items():
-            if re.search(rf"\b{token}\b", t):
-                return _next_weekday(base, wd).isoformat()
-
-    return None
+    intent = yes_no_intent(answer)
+    price = parse_price(answer)
+    supplier_date = parse_date(answer, task.get("current_date"))
+    supplier_tw = infer_time_window(answer)
+    data = {"can_do": False, "meets_date": None, "meets_time_window": None,
+            "price": price, "supplier_date": supplier_date, "notes": answer}
+
+    if intent is False:
+        return data, 0.9
+    if intent is None and price is None:
+        return data, 0.2
+    if intent is None and has_negation(answer):
+        # "sim, mas não tenho a preta, a branca sai R$ 80": afirmativo e negativo juntos, a LLM decide
+        return data, 0.3
+
+    data["can_do"] = True
+    confidence = 0.9 if intent else 0.75  # só preço, sem "sim" nem negação: aceite implícito
+
+    if has_qualifier(answer):
+        confidence = min(confidence, 0.5)  # "sim, mas só semana que vem": aceite com condição, a LLM decide
+
+    desired = task.get("desired_date")
+    if desired is not None:
+        # sem data na resposta não dá para dizer que atende a data pedida: o follow-up pergunta
+        data["meets_date"] = supplier_date == desired if supplier_date else None
+        if supplier_date and supplier_date != desired:
+            confidence = min(confidence, 0.5)  # contra-proposta ou data mal lida: a LLM decide
+    if not supplier_date and mentions_date(answer):
+        confidence = min(confidence, 0.5)  # fala de data num formato que parse_date não resolve
+    timew = task.get("time_window")
+    if timew is not None:
+        data["meets_time_window"] = supplier_tw == timew if supplier_tw else True
+        if supplier_tw and supplier_tw != timew:
+            confidence = min(confidence, 0.5)
+
+    if price is None and (re.search(r"\d", answer or "") or len((answer or "").split()) > 3):
+        confidence = min(confidence, 0.5)  # pode haver preço por extenso ou em formato que não reconhecemos
+    return data, confidence
 
 class SupplierAnswerParserNode:
-    def __init__(self):
-        self.llm = LLMClient()
+    def __init__(self, mode: str | None = None, min_confidence: float | None = None):
+        self.llm = get_llm_client()
+        self.mode = mode or ANSWER_PARSER_MODE
+        self.min_confidence = ANSWER_RULES_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        self.stats = {"rules": 0, "llm": 0, "llm_error": 0}
 
-    def run(self, task: dict, supplier: dict, answer: str) -> dict:
+    def _llm_parse(self, task: dict, supplier: dict, answer: str) -> dict:
         system = (
             "Você recebe a TAREFA do cliente e a RESPOSTA do fornecedor. "
             "Decida se o fornecedor consegue atender (can_do). "
@@ -111,12 +95,24 @@ class SupplierAnswerParserNode:
             "answer": answer,
         }
 
-        try:
-            raw = self.llm.ask(system, json.dumps(payload, ensure_ascii=False))
-            data = json.loads(raw)
-        except Exception:
-            data = {"can_do": False, "price": None, "supplier_date": None, "notes": answer,
-                    "meets_date": None, "meets_time_window": None}
+        raw = self.llm.ask(system, json.dumps(payload, ensure_ascii=False))
+        return json.loads(raw)
+
+    def run(self, task: dict, supplier: dict, answer: str, persist: bool = True) -> dict:
+        """persist=False só interpreta; quem chamou decide se grava a oferta (save_offer)."""
+        data, parser = None, "llm"
+        if self.mode != "llm":
+            rules, confidence = rule_parse(task, answer)
+            if confidence >= self.min_confidence:
+                data, parser = rules, "rules"
+        if data is None:
+            try:
+                data = self._llm_parse(task, supplier, answer)
+            except Exception:
+                parser = "llm_error"
+                data = {"can_do": False, "price": None, "supplier_date": None, "notes": answer,
+                        "meets_date": None, "meets_time_window": None}
+        self.stats[parser] += 1
 
         can_do = bool(data.get("can_do"))
         price = data.get("price")
@@ -148,26 +144,29 @@ class SupplierAnswerParserNode:
                 "lead_time_days": None,
                 "notes": data.get("notes") or answer,
             }
+            if persist:
+                self.save_offer(task, supplier, offer, parser)
 
-            try:
-                db.offers.insert_one({
-                    "run_id": task.get("run_id"),
-                    "created_at": datetime.utcnow(),
-                    "supplier": {
-                        "id": supplier.get("id"),
-                        "name": supplier.get("name"),
-                    },
-                    "task": {
-                        "service_type": task.get("service_type"),
-                        "description": task.get("description"),
-                        "desired_date": task.get("desired_date"),
-                        "time_window": task.get("time_window"),
-                        "location": task.get("location"),
-                        "current_date": task.get("current_date"),
-                    },
-                    "offer": offer
-                })
-            except Exception:
-                pass
+        return {"accepted": bool(offer), "need_more": not bool(offer), "offer": offer, "parser": parser}
 
-        return {"accepted": bool(offer), "need_more": not bool(offer), "offer": offer}
+    def save_offer(self, task: dict, supplier: dict, offer: dict, parser: str | None = None):
+        writer.insert("offers", {
+            "run_id": task.get("run_id"),
+            "created_at": datetime.utcnow(),
+            "supplier": {
+                "id": supplier.get("id"),
+                "name": supplier.get("name"),
+            },
+            "task": {
+                "service_type": task.get("service_type"),
+                "description": task.get("description"),
+                "desired_date": task.get("desired_date"),
+                "time_window": task.get("time_window"),
+                "location": task.get("location"),
+                "color": task.get("color"),
+                "size": task.get("size"),
+                "current_date": task.get("current_date"),
+            },
+            "offer": offer,
+            "parser": parser,
+        })
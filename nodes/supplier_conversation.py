@@ -0,0 +1,50 @@
+import os
+from db.supplier_stats import record_outcome
+from nodes.supplier_followup_node import supplier_answers
+
+QUOTE_MAX_FOLLOWUPS = int(os.getenv("QUOTE_MAX_FOLLOWUPS", "2"))   # follow-ups por fornecedor
+
+
+class SupplierConversation:
+    """
+    Conversa com um fornecedor: pergunta inicial, respostas e no máximo
+    `max_followups` perguntas extras. O estado (transcript e contagem) é só
+    dados, para poder ser guardado no session_state do Streamlit ou no
+    checkpoint do LangGraph e reconstruído depois. Com persist=False nada é gravado
+    (nem a oferta nem supplier_stats): quem chamou decide, como o SupplierFanoutNode.
+    """
+
+    def __init__(self, task: dict, supplier: dict, transcript: list[dict] | None = None, followups: int = 0,
+                 max_followups: int = QUOTE_MAX_FOLLOWUPS, followup_node=None, answer_node=None,
+                 persist: bool = True):
+        from resources import get_answer_node, get_followup_node
+        self.task = task
+        self.supplier = supplier
+        self.transcript = list(transcript or [])
+        self.followups = followups
+        self.max_followups = max_followups
+        self.fnode = followup_node or get_followup_node()
+        self.anode = answer_node or get_answer_node()
+        self.persist = persist
+
+    def ask(self, question: str):
+        self.transcript.append({'role': 'assistant', 'content': question})
+
+    def reply(self, answer: str) -> dict:
+        """
+        Registra a resposta e decide: oferta aceita, nova pergunta ou fim.
+        Retorna {"done", "accepted", "offer", "parser", "question"}.
+        Ao encerrar, o resultado do contato entra em supplier_stats.
+        """
+        self.transcript.append({'role': 'supplier', 'content': (answer or '').strip()})
+        out = self.anode.run(self.task, self.supplier, supplier_answers(self.transcript), persist=self.persist)
+        question = None
+        if not out.get('accepted') and self.followups < self.max_followups:
+            question = self.fnode.next_question(self.task, self.supplier, self.transcript)
+            if question:
+                self.followups += 1
+                self.ask(question)
+        if question is None and self.persist:
+            record_outcome(self.task, self.supplier, 'accepted' if out.get('accepted') else 'rejected', out.get('offer'))
+        return {'done': question is None, 'accepted': bool(out.get('accepted')), 'offer': out.get('offer'),
+                'parser': out.get('parser'), 'question': question}
@@ -0,0 +1,177 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable
+from db.supplier_stats import record_outcome
+from nodes.service_common import QUOTE_MAX_OFFERS
+from nodes.supplier_conversation import SupplierConversation
+from tracing import current_run_id, run_context, tracer
+
+SUPPLIER_FANOUT_WORKERS = int(os.getenv("SUPPLIER_FANOUT_WORKERS", "8"))     # fornecedores contatados ao mesmo tempo
+SUPPLIER_REPLY_TIMEOUT = float(os.getenv("SUPPLIER_REPLY_TIMEOUT", "30"))    # segundos por fornecedor
+
+# responder(task, supplier, question) -> resposta do fornecedor (None = sem resposta)
+Responder = Callable[[dict, dict, str], str | None]
+
+
+class SupplierFanoutNode:
+    """
+    Contato concorrente: pergunta a vários fornecedores de uma vez por um canal
+    automático (`responder`), interpreta cada resposta assim que chega e para
+    quando junta `max_offers` ofertas. O tempo total passa a ser o do mais lento
+    entre os primeiros que aceitam, e não a soma de todos. As threads só interpretam
+    as respostas; a oferta e o resultado em supplier_stats são gravados aqui, pelo
+    coordenador, e só para as ofertas que entram no orçamento.
+    """
+
+    def __init__(self, responder: Responder, workers: int = SUPPLIER_FANOUT_WORKERS,
+                 timeout: float = SUPPLIER_REPLY_TIMEOUT, max_offers: int = QUOTE_MAX_OFFERS,
+                 question_node=None, answer_node=None):
+        from resources import get_answer_node, get_question_node
+        self.responder = responder
+        self.workers = workers
+        self.timeout = timeout
+        self.max_offers = max_offers
+        self.qnode = question_node or get_question_node()
+        self.anode = answer_node or get_answer_node()
+
+    def _contact(self, task: dict, supplier: dict, started: dict, key: int, stop: threading.Event,
+                 abandoned: threading.Event) -> dict:
+        started[key] = time.monotonic()
+        if stop.is_set():
+            return {"status": "cancelled"}
+        with tracer.span("node", "supplier_fanout_contact", supplier_id=supplier.get("id")):
+            question = self.qnode.run(task, supplier)
+            conv = SupplierConversation(task, supplier, answer_node=self.anode, persist=False)
+            conv.ask(question)
+            while True:
+                answer = self.responder(task, supplier, question)
+                # Chegou depois do prazo ou depois de já termos ofertas suficientes: não interpreta nem grava.
+                if abandoned.is_set() or stop.is_set():
+                    return {"status": "cancelled", "transcript": conv.transcript}
+                if answer is None:
+                    record_outcome(task, supplier, "no_answer")
+                    return {"status": "no_answer", "transcript": conv.transcript}
+                out = conv.reply(answer)
+                if out["done"]:
+                    break
+                question = out["question"]
+        return {"status": "accepted" if out["accepted"] else "rejected", "transcript": conv.transcript,
+                "offer": out["offer"], "parser": out["parser"]}
+
+    def run(self, task: dict, suppliers: list[dict]) -> dict:
+        """
+        Retorna {"offers": [...], "results": {supplier_id: {...status...}}, "elapsed_ms": float}.
+        status: accepted | rejected | no_answer | timeout | error | cancelled | surplus
+        ("surplus" = aceitou, mas as ofertas já estavam completas).
+        """
+        t0 = time.perf_counter()
+        offers: list[dict] = []
+        results: dict = {}
+        started: dict = {}
+        stop = threading.Event()
+        run_id = current_run_id.get() or task.get("run_id")
+
+        def job(key: int, sup: dict, abandoned: threading.Event) -> dict:
+            with run_context(run_id):
+                return self._contact(task, sup, started, key, stop, abandoned)
+
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(suppliers))),
+                                  thread_name_prefix="supplier-fanout")
+        pending: dict[Future, tuple[int, dict, threading.Event]] = {}
+        try:
+            for i, sup in enumerate(suppliers):
+                abandoned = threading.Event()
+                pending[pool.submit(job, i, sup, abandoned)] = (i, sup, abandoned)
+
+            while pending:
+                # O prazo de cada fornecedor conta a partir do início do contato, não da fila do pool.
+                now = time.monotonic()
+                waits = [started[k] + self.timeout - now for k, _, _ in pending.values() if k in started]
+                done, _ = wait(pending, timeout=max(0.0, min(waits)) if waits else 0.05, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    _, sup, _ = pending.pop(fut)
+                    try:
+                        res = fut.result()
+                    except Exception as e:
+                        res = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+                    if res["status"] == "accepted":
+                        if len(offers) < self.max_offers:
+                            offers.append(res["offer"])
+                            self.anode.save_offer(task, sup, res["offer"], res.get("parser"))
+                            record_outcome(task, sup, "accepted", res["offer"])
+                        else:
+                            res["status"] = "surplus"
+                    elif res["status"] == "rejected":
+                        record_outcome(task, sup, "rejected")
+                    results[sup.get("id")] = res
+                now = time.monotonic()
+                for fut, (key, sup, abandoned) in list(pending.items()):
+                    t = started.get(key)
+                    if t is not None and now - t >= self.timeout:
+                        abandoned.set()
+                        fut.cancel()
+                        pending.pop(fut)
+                        results[sup.get("id")] = {"status": "timeout"}
+                        record_outcome(task, sup, "timeout")
+                if len(offers) >= self.max_offers:
+                    stop.set()
+                    for fut, (_, sup, abandoned) in pending.items():
+                        fut.cancel()
+                        abandoned.set()
+                        results[sup.get("id")] = {"status": "cancelled"}
+                    pending.clear()
+        finally:
+            # Não espera quem ainda está aguardando resposta: os resultados serão descartados.
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        for res in results.values():
+            tracer.inc("quote_fanout_results_total", status=res["status"])
+        return {"offers": offers, "results": results, "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2)}
+
+
+class SimulatedResponder:
+    """
+    Fornecedor de mentira para testes e benchmarks: demora entre `min_latency` e
+    `max_latency` segundos e aceita com probabilidade `accept_rate`, com preço em BRL.
+    Com `partial_rate`, parte dos que aceitam responde só "Tenho sim" e manda o
+    preço no follow-up.
+    """
+
+    def __init__(self, accept_rate: float = 0.6, min_latency: float = 0.2, max_latency: float = 3.0,
+                 no_answer_rate: float = 0.0, partial_rate: float = 0.0, seed: int | None = None):
+        self.accept_rate = accept_rate
+        self.partial_rate = partial_rate
+        self.min_latency = min_latency
+        self.max_latency = max_latency
+        self.no_answer_rate = no_answer_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._partial: set = set()   # fornecedores que já responderam sem preço
+
+    def __call__(self, task: dict, supplier: dict, question: str) -> str | None:
+        with self._lock:
+            latency = self._rng.uniform(self.min_latency, self.max_latency)
+            roll = self._rng.random()
+            price = self._rng.randint(40, 250)
+            key = supplier.get("id")
+            if key in self._partial:
+                self._partial.discard(key)
+                followup = True
+            else:
+                followup = False
+                partial = self._rng.random() < self.partial_rate
+        time.sleep(latency)
+        if followup:
+            return f"Fica R$ {price},00"
+        if roll < self.no_answer_rate:
+            return None
+        if roll < self.no_answer_rate + self.accept_rate:
+            if partial:
+                with self._lock:
+                    self._partial.add(key)
+                return "Tenho sim"
+            return f"Tenho sim, R$ {price},00"
+        return "Infelizmente não consigo atender"
@@ -1,7 +1,40 @@
 import json
-from llm_client import LLMClient
+import os
+from llm_client import get_llm_client
+from nodes.supplier_answer_parser_node import ANSWER_RULES_MIN_CONFIDENCE, rule_parse
+from nodes.supplier_question_node import _format_when
+
+# O que vai para a LLM: a primeira pergunta + as últimas N mensagens, cada uma cortada em M caracteres.
+FOLLOWUP_HISTORY_MESSAGES = int(os.getenv("FOLLOWUP_HISTORY_MESSAGES", "6"))
+FOLLOWUP_MESSAGE_CHARS = int(os.getenv("FOLLOWUP_MESSAGE_CHARS", "300"))
+
+def trim_transcript(transcript: list[dict], max_messages: int = FOLLOWUP_HISTORY_MESSAGES,
+                    max_chars: int = FOLLOWUP_MESSAGE_CHARS) -> list[dict]:
+    if len(transcript) <= max_messages:
+        msgs = transcript
+    elif max_messages <= 1:
+        msgs = transcript[:max(max_messages, 0)]
+    else:
+        # primeira pergunta (o pedido) + as últimas mensagens
+        msgs = transcript[:1] + transcript[len(transcript) - (max_messages - 1):]
+    return [{'role': m.get('role'), 'content': (m.get('content') or '')[:max_chars]} for m in msgs]
+
+def supplier_answers(transcript: list[dict]) -> str:
+    """Todas as respostas do fornecedor juntas: "sim" + "R$ 80" são lidos como uma resposta só."""
+    return ' '.join(m['content'] for m in transcript if m.get('role') == 'supplier' and m.get('content'))
+
+def missing_info(task: dict, data: dict) -> list[str]:
+    missing = []
+    if data.get('price') is None:
+        missing.append('price')
+    if task.get('desired_date') and data.get('meets_date') is not True:
+        missing.append('date')
+    if task.get('time_window') and data.get('meets_time_window') is not True:
+        missing.append('time_window')
+    return missing
+
 class SupplierFollowupNode:
-    def __init__(self): self.llm = LLMClient()
+    def __init__(self): self.llm = get_llm_client()
     def run(self, task: dict, supplier: dict, transcript: list[dict]) -> str | None:
         sys=(
             "Você recebe o histórico de mensagens entre atendente e fornecedor. "
@@ -10,6 +43,30 @@ class SupplierFollowupNode:
             "Caso já esteja claro que atende com preço informado e no prazo (quando houver), responda exatamente 'STOP'. "
             "Sem markdown. Responda com a pergunta ou 'STOP'."
         )
-        usr=json.dumps({'task':task,'supplier':supplier,'history':transcript}, ensure_ascii=False)
+        usr=json.dumps({'task':task,'supplier':supplier,'history':trim_transcript(transcript)}, ensure_ascii=False)
         out=self.llm.ask(sys, usr).strip()
         return out
+    def next_question(self, task: dict, supplier: dict, transcript: list[dict]) -> str | None:
+        """
+        Próxima pergunta ao fornecedor, ou None se não há o que perguntar (recusou ou já respondeu tudo).
+        Quando o parser determinístico entende a resposta, a pergunta sai de um template; a LLM só
+        entra quando ele não tem confiança.
+        """
+        data, confidence = rule_parse(task, supplier_answers(transcript))
+        if confidence >= ANSWER_RULES_MIN_CONFIDENCE:
+            if not data.get('can_do'):
+                return None
+            missing = missing_info(task, data)
+            if not missing:
+                return None
+            if missing == ['price']:
+                return 'Qual seria o preço?'
+            when = _format_when(task).strip()
+            if 'price' in missing:
+                return f'Consegue atender {when} e qual seria o preço?'
+            return f'Consegue atender {when}?'
+        try:
+            q = (self.run(task, supplier, transcript) or '').strip()
+        except Exception:
+            return None
+        return None if not q or q.upper().startswith('STOP') else q
@@ -1,6 +1,23 @@
-import json
+import contextvars
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from llm_client import LLMClient
+from typing import Iterator
+from llm_client import get_llm_client
+from prompts import SUPPLIER_QUESTION
+
+# Máximo de perguntas geradas em paralelo (limita chamadas simultâneas ao Ollama).
+SUPPLIER_QUESTION_WORKERS = int(os.getenv("SUPPLIER_QUESTION_WORKERS", "4"))
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SUPPLIER_QUESTION_WORKERS, thread_name_prefix="supplier-question")
+        return _executor
 
 WEEKDAYS_PT = [
     "segunda-feira", "terça-feira", "quarta-feira",
@@ -34,143 +51,154 @@ def _format_when(task: dict) -> str:
     return (" " + " ".join(parts)) if parts else ""
 
 
-class SupplierQuestionNode:
-    def __init__(self, tone: str | None = None):
-        self.llm = LLMClient()
+CLOTHING_KEYWORDS = ["camisa", "camiseta", "calça", "tamanho", "preço", "preco"]
 
-    def _fallback(self, task: dict, supplier: dict) -> str:
-        """Pergunta determinística para cada tipo de serviço."""
-        name = supplier.get("name", "fornecedor")
-        stype = (task.get("service_type") or "").lower()
-        when = _format_when(task)
+# "template": perguntas montadas sem a LLM (microssegundos); "llm": LLM para roupas, com o template de fallback.
+QUESTION_MODE = os.getenv("QUESTION_MODE", "template")
+QUESTION_TONE = os.getenv("QUESTION_TONE", "neutral")
 
-        if stype == "faucet_repair":
-            if when:
-                return f"Olá {name}, você consegue consertar uma torneira pingando{when}? Qual seria o preço?"
-            return f"Olá {name}, você consegue consertar uma torneira pingando? Se sim, quando e qual seria o preço?"
-        elif stype == "tshirt_sale":
-            color = task.get("color", "")
-            size = task.get("size", "")
-            base = f"Olá {name}, você tem camiseta {color} tamanho {size}{when}?"
-            return f"{base} Qual seria o preço?"
-        else:  
-            color = task.get("color", "")
-            size = task.get("size", "")
-            base = f"Olá {name}, você tem calça {color} tamanho {size}{when}?"
-            return f"{base} Qual seria o preço?"
+ITEM_PT = {"tshirt_sale": "camiseta", "pants_sale": "calça"}
 
-    def run(self, task: dict, supplier: dict) -> str:
+# Variações de tom; supplier["tone"] tem prioridade sobre o tom do nó.
+TONES = {
+    "neutral": {"greeting": "Olá {name}, ", "have": "você tem", "fix": "você consegue consertar",
+                "price": "Qual seria o preço?", "open_price": "Se sim, quando e qual seria o preço?",
+                "options": "Quais {what} estão disponíveis e qual seria o preço?"},
+    "formal": {"greeting": "Prezados da {name}, ", "have": "vocês teriam", "fix": "vocês poderiam consertar",
+               "price": "Poderiam informar o valor?", "open_price": "Em caso positivo, quando poderiam vir e qual seria o valor?",
+               "options": "Quais {what} estão disponíveis e qual seria o valor?"},
+    "casual": {"greeting": "Oi {name}, ", "have": "tem", "fix": "consegue consertar",
+               "price": "Quanto fica?", "open_price": "Se der, quando seria e quanto fica?",
+               "options": "Quais {what} você tem e quanto fica?"},
+}
+
+class SupplierQuestionNode:
+    def __init__(self, tone: str | None = None, mode: str | None = None):
+        self.llm = get_llm_client()
+        self.tone = tone or QUESTION_TONE
+        self.mode = mode or QUESTION_MODE
+        # perguntas agendadas por prefetch(), por (run_id, id do fornecedor); run/stream usam o resultado
+        self._prefetched: dict[tuple, Future] = {}
+        self._prefetch_lock = threading.Lock()
+
+    def template(self, task: dict, supplier: dict) -> str:
+        """Pergunta determinística para cada tipo de serviço (sem LLM)."""
+        name = supplier.get("name") or "fornecedor"
         stype = (task.get("service_type") or "").lower()
+        when = _format_when(task)
+        t = TONES.get(supplier.get("tone") or self.tone, TONES["neutral"])
+        greeting = t["greeting"].format(name=name)
 
         if stype == "faucet_repair":
-            return self._fallback(task, supplier)
-
-        sys = (
-        """Você é um atendente que ajuda pessoas a resolverem tarefas. Seu papel é perguntar ao fornecedor exatamente sobre a tarefa específica que o cliente descreveu.
-        Entrada: um JSON com "task" e "supplier".
-        Saída: uma única pergunta em pt-BR, sem markdown, sem aspas, sem asteriscos, uma frase, máx. 200 caracteres, com exatamente um “?”.
-
-        Regras
-        Sem invenções: use apenas o que estiver no JSON.
-
-        Vocabulário por tipo de serviço
-
-        tshirt_sale → use o termo “camiseta”.
-
-        pants_sale → use o termo “calça”.
-
-        Atributos
-
-        Se color e/ou size existirem, mencione-os exatamente como vieram (não traduza nem reformatte).
-
-        Se color/size faltarem, pergunte a disponibilidade desses atributos.
-
-        Preço: sempre pergunte o preço.
-
-        Data e turno
-
-        Se desired_date (ISO YYYY-MM-DD) existir: formate como “no dia DD/MM/AAAA”.
-
-        Se time_window existir: morning→“de manhã”, afternoon→“à tarde”, evening→“à noite”.
-
-        Tratamento do fornecedor
-
-        Se supplier.name existir, você pode iniciar com “Olá {nome}, …”.
-
-        Restrições de saída
-
-        Uma frase, um único “?”, sem quebras de linha, ≤ 200 caracteres.
-
-        Não peça telefone, e-mail, link externo, desconto ou dados pessoais.
-
-        Não repita atributos já informados pelo cliente.
-
-        Exemplos
-        IN
-        {"task":{"service_type":"tshirt_sale","color":"preta","size":"GG","desired_date":"2025-08-14","time_window":"afternoon"},"supplier":{"name":"Loja Camiseta 1"}}
-
-        OUT
-        Olá Loja Camiseta 1, você tem camiseta preta tamanho GG no dia 14/08/2025 à tarde e qual é o preço?
-
-        IN
-        {"task":{"service_type":"pants_sale","color":null,"size":null,"desired_date":null,"time_window":null},"supplier":{"name":"Loja Calça 2"}}
-
-        OUT
-        Olá Loja Calça 2, você tem calça e quais cores e tamanhos disponíveis e qual é o preço?
-
-        IN
-        {"task":{"service_type":"tshirt_sale","color":"azul","size":"42","desired_date":null,"time_window":"morning"},"supplier":{"name":"Loja Camiseta 7"}}
-
-        OUT
-        Olá Loja Camiseta 7, você tem camiseta azul tamanho 42 de manhã e qual é o preço?
-
-        IN
-        {"task":{"service_type":"pants_sale","color":"branca","size":"M","desired_date":"2025-09-02","time_window":null},"supplier":{"name":"Loja Calça 5"}}
-
-        OUT
-        Olá Loja Calça 5, você tem calça branca tamanho M no dia 02/09/2025 e qual é o preço?
-
-        IN
-        {"task":{"service_type":"faucet_repair","desired_date":"2025-08-14","time_window":"afternoon"},"supplier":{"name":"João Encanador 1"}}
-
-        OUT
-        Olá João Encanador 1, você consegue consertar uma torneira pingando na quinta-feira (14/08/2025) à tarde? Qual seria o preço?
-
-        IN
-        {"task":{"service_type":"faucet_repair","desired_date":null,"time_window":"morning"},"supplier":{"name":"João Encanador 2"}}
-
-        OUT
-        Olá João Encanador 2, você consegue consertar uma torneira pingando de manhã? Qual seria o preço?
-
-        IN
-        {"task":{"service_type":"faucet_repair","desired_date":"2025-09-02","time_window":null},"supplier":{"name":"João Encanador 3"}}
+            if when:
+                return f"{greeting}{t['fix']} uma torneira pingando{when}? {t['price']}"
+            return f"{greeting}{t['fix']} uma torneira pingando? {t['open_price']}"
+
+        color, size = task.get("color"), task.get("size")
+        item = ITEM_PT.get(stype, "calça")
+        if color:
+            item += f" {color}"
+        if size:
+            item += f" tamanho {size}"
+        missing = [w for w, v in (("cores", color), ("tamanhos", size)) if not v]
+        tail = t["options"].format(what=" e ".join(missing)) if missing else t["price"]
+        return f"{greeting}{t['have']} {item}{when}? {tail}"
 
-        OUT
-        Olá João Encanador 3, você consegue consertar uma torneira pingando na terça-feira (02/09/2025)? Qual seria o preço?
+    def _fallback(self, task: dict, supplier: dict) -> str:
+        return self.template(task, supplier)
+
+    def _use_llm(self, task: dict) -> bool:
+        return self.mode == "llm" and (task.get("service_type") or "").lower() in ITEM_PT
+
+    def _prefetch_key(self, task: dict, supplier: dict) -> tuple:
+        return task.get("run_id"), supplier.get("id")
+
+    def _take_prefetched(self, task: dict, supplier: dict) -> str | None:
+        """
+        Pergunta já agendada por prefetch(): pronta ou em andamento, espera o resultado; se ainda
+        estava na fila do pool, cancela e devolve None (quem chamou gera, ex.: token a token).
+        """
+        with self._prefetch_lock:
+            fut = self._prefetched.pop(self._prefetch_key(task, supplier), None)
+        if fut is None or fut.cancel():
+            return None
+        try:
+            return fut.result()
+        except Exception:
+            return None
 
-        IN
-        {"task":{"service_type":"faucet_repair","desired_date":null,"time_window":null},"supplier":{"name":"João Encanador 4"}}
+    def cancel_prefetch(self, run_id: str | None):
+        """Descarta o que foi agendado para a sessão (orçamento gerado ou sessão nova)."""
+        with self._prefetch_lock:
+            keys = [k for k in self._prefetched if k[0] == run_id]
+            futures = [self._prefetched.pop(k) for k in keys]
+        for fut in futures:
+            fut.cancel()
 
-        OUT
-        Olá João Encanador 4, você consegue consertar uma torneira pingando? Se sim, quando e qual seria o preço?
+    def run(self, task: dict, supplier: dict) -> str:
+        q = self._take_prefetched(task, supplier)
+        return q if q is not None else self._generate(task, supplier)
 
-        IN
-        {"task":{"service_type":"faucet_repair","desired_date":"2025-08-15","time_window":"evening"},"supplier":{"name":"João Encanador 5"}}
+    def _generate(self, task: dict, supplier: dict) -> str:
+        if not self._use_llm(task):
+            return self.template(task, supplier)
 
-        OUT
-        Olá João Encanador 5, você consegue consertar uma torneira pingando na sexta-feira (15/08/2025) à noite? Qual seria o preço?
-        
-        Responda somente a pergunta final."""
-        )
-        payload = {"task": task, "supplier": supplier}
+        system, user = SUPPLIER_QUESTION.render({"task": task, "supplier": supplier})
         try:
-            q = self.llm.ask(sys, json.dumps(payload, ensure_ascii=False)).strip().replace("\n", " ")
-            if not q:
-                return self._fallback(task, supplier)
-            if stype in {"tshirt_sale", "pants_sale"} and not any(
-                w in q.lower() for w in ["camisa", "camiseta", "calça", "tamanho", "preço", "preco"]
-            ):
-                return self._fallback(task, supplier)
-            return q
+            q = self.llm.ask(system, user)
+            return self._validate(q, task, supplier)
         except Exception:
             return self._fallback(task, supplier)
+
+    def _validate(self, q: str, task: dict, supplier: dict) -> str:
+        """Pergunta final da LLM, ou a determinística se vier vazia/fora do assunto."""
+        q = q.strip().replace("\n", " ")
+        stype = (task.get("service_type") or "").lower()
+        if not q:
+            return self._fallback(task, supplier)
+        if stype in {"tshirt_sale", "pants_sale"} and not any(w in q.lower() for w in CLOTHING_KEYWORDS):
+            return self._fallback(task, supplier)
+        return q
+
+    def stream(self, task: dict, supplier: dict) -> Iterator[str]:
+        """
+        Versão incremental de run(): gera o texto acumulado a cada token.
+        O último valor é sempre a pergunta final validada (pode ser o fallback).
+        """
+        q = self._take_prefetched(task, supplier)
+        if q is not None:
+            yield q
+            return
+        if not self._use_llm(task):
+            yield self.template(task, supplier)
+            return
+        system, user = SUPPLIER_QUESTION.render({"task": task, "supplier": supplier})
+        acc = ""
+        try:
+            for chunk in self.llm.stream(system, user):
+                acc += chunk
+                yield acc.replace("\n", " ")
+        except Exception:
+            yield self._fallback(task, supplier)
+            return
+        yield self._validate(acc, task, supplier)
+
+    def prefetch(self, task: dict, suppliers: list[dict]) -> list[Future]:
+        """
+        Agenda a pergunta de cada fornecedor no pool; retorna os futures na mesma ordem. Com
+        task["run_id"], run()/stream() desse fornecedor nessa sessão usam o resultado agendado.
+        """
+        pool = _get_executor()
+        # copy_context: o run_id do tracing acompanha a chamada até a thread do pool
+        futures = [pool.submit(contextvars.copy_context().run, self._generate, task, s) for s in suppliers]
+        if task.get("run_id"):
+            with self._prefetch_lock:
+                for s, fut in zip(suppliers, futures):
+                    self._prefetched[self._prefetch_key(task, s)] = fut
+        return futures
+
+    def run_many(self, task: dict, suppliers: list[dict]) -> list[str]:
+        """Gera as perguntas de todos os fornecedores em paralelo (ordem preservada)."""
+        pool = _get_executor()
+        futures = [pool.submit(contextvars.copy_context().run, self.run, task, s) for s in suppliers]
+        return [f.result() for f in futures]
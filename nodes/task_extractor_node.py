@@ -0,0 +1,76 @@
+import json
+import re
+from datetime import date
+from categories import registry
+from llm_client import get_llm_client
+from nodes.classifier_node import CLASSIFIER_MIN_CONFIDENCE, keyword_score
+from nodes.clothing_normalizer_node import _normalize_color, _normalize_size, _regex_extract
+from nodes.text_extract import infer_time_window, relative_date
+
+class TaskExtractorNode:
+    """
+    Classificação + normalização numa única chamada à LLM.
+    Devolve None quando a resposta não passa na validação; aí o workflow
+    segue pelo caminho antigo (ClassifierNode -> *NormalizerNode).
+    """
+
+    def __init__(self, min_confidence: float | None = None):
+        self.llm = get_llm_client()
+        self.min_confidence = CLASSIFIER_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        self.stats = {"fused": 0, "invalid": 0, "llm_error": 0}
+
+    def _prompt(self, current_date: str | None) -> str:
+        return (
+            "You classify and extract a customer request in a single step. Output ONLY valid JSON with keys:\n"
+            "  category ('manual_process' or 'clothing'),\n"
+            "  service_type ('faucet_repair' for manual_process; 'tshirt_sale' or 'pants_sale' for clothing),\n"
+            "  description (copy of user text),\n"
+            "  color (lowercase pt-BR or null), size (exact size string like 'GG','M','42' or null),\n"
+            "  location (or null), desired_date (YYYY-MM-DD or null).\n"
+            "Rules:\n"
+            "- plumbing, faucet, leaks or similar => manual_process; shirts, pants, clothing => clothing.\n"
+            "- camisa/camiseta => 'tshirt_sale'; calça => 'pants_sale'.\n"
+            "- Do NOT invent values. If a field is not explicitly present, use null.\n"
+            "- 'preto'/'branco' => 'preta'/'branca'.\n"
+            f"- Today is {current_date or 'unknown'}; relative dates (amanhã, quinta-feira) become ISO 'YYYY-MM-DD'."
+        )
+
+    def _validate(self, data, task_text: str, current_date: str | None) -> dict | None:
+        if not isinstance(data, dict):
+            return None
+        category, stype = data.get("category"), data.get("service_type")
+        if stype not in registry.service_types_of(category):
+            return None
+        # Heurística confiante e discordando da LLM: melhor refazer pelo caminho de duas etapas.
+        label, confidence = keyword_score(task_text)
+        if confidence >= self.min_confidence and label != category:
+            return None
+
+        dd = data.get("desired_date")
+        desired = dd if isinstance(dd, str) and re.fullmatch(r"\d{4}-\d{2}-\d{2}", dd) else None
+        if category == "manual_process":
+            if not desired and current_date:
+                desired = relative_date(task_text, date.fromisoformat(current_date))
+            loc = data.get("location")
+            task = {"service_type": stype, "description": data.get("description") or task_text,
+                    "location": loc if isinstance(loc, str) and loc.strip() else None,
+                    "desired_date": desired, "time_window": infer_time_window(task_text)}
+        else:
+            color_rx, size_rx, service_rx = _regex_extract(task_text)
+            c, s = data.get("color"), data.get("size")
+            c = _normalize_color(c) if isinstance(c, str) else None
+            s = _normalize_size(str(s)) if isinstance(s, str) or isinstance(s, int) else None
+            task = {"service_type": stype, "description": data.get("description") or task_text,
+                    "color": c or color_rx, "size": s or size_rx, "desired_date": desired}
+        return {"category": category, "normalized_task": task}
+
+    def run(self, task_text: str, current_date: str | None = None) -> dict | None:
+        user = json.dumps({"task_text": task_text, "current_date": current_date}, ensure_ascii=False)
+        try:
+            data = json.loads(self.llm.ask(self._prompt(current_date), user))
+        except Exception:
+            self.stats["llm_error"] += 1
+            return None
+        out = self._validate(data, task_text, current_date)
+        self.stats["fused" if out else "invalid"] += 1
+        return out
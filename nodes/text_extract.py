@@ -0,0 +1,217 @@
+import re
+from datetime import date, timedelta
+
+WEEKDAY_MAP = {
+    "segunda": 0, "segunda-feira": 0, "seg": 0,
+    "terça": 1, "terca": 1, "terça-feira": 1, "ter": 1,
+    "quarta": 2, "quarta-feira": 2, "qua": 2,
+    "quinta": 3, "quinta-feira": 3, "qui": 3,
+    "sexta": 4, "sexta-feira": 4, "sex": 4,
+    "sábado": 5, "sabado": 5, "sáb": 5, "sab": 5,
+    "domingo": 6, "dom": 6,
+}
+
+TOKEN_RE = re.compile(r"\w+(?:-\w+)*")
+
+SIZE_RES = [
+    re.compile(r"\btam(?:anho)?\s*[:\-]?\s*([x]{0,3}g{1,2}|pp|p|m|g|gg|xg|xxg|xgg|xggg|xl|xxl|xxxl)\b", re.IGNORECASE),
+    re.compile(r"\b([x]{0,3}g{1,2}|pp|p|m|g|gg|xg|xxg|xgg|xggg|xl|xxl|xxxl)\b", re.IGNORECASE),
+    re.compile(r"\btam(?:anho)?\s*[:\-]?\s*(\d{2})\b", re.IGNORECASE),
+    re.compile(r"\b(\d{2})\b"),
+]
+COLOR_RE = re.compile(
+    r"\b(preto|preta|branco|branca|azul|vermelh[oa]|verde|amarel[oa]|cinza|rosa|roxo|marrom|bege|lil[aá]s|vinho|bord[oó])\b",
+    re.IGNORECASE,
+)
+PANTS_RE = re.compile(r"\b(cal[cç]a|pants)\b")
+
+_AMOUNT = r"(\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?|\d+(?:[.,]\d{1,2})?)"
+PRICE_BRL_RE = re.compile(r"r\$\s*" + _AMOUNT, re.IGNORECASE)
+PRICE_REAIS_RE = re.compile(_AMOUNT + r"\s*(?:reais|real|pila|conto)\b", re.IGNORECASE)
+
+NO_RE = re.compile(
+    r"\b(n[ãa]o|infelizmente|sem estoque|sem disponibilidade|indispon[ií]ve(?:l|is)|esgotad[oa]s?|negativo)\b",
+    re.IGNORECASE,
+)
+NEGATED_RE = re.compile(r"\bn[ãa]o\s+\w+", re.IGNORECASE)  # "não tenho" não conta como "tenho"
+YES_RE = re.compile(
+    r"\b(sim|tenho|temos|consigo|conseguimos|posso|podemos|dispon[ií]ve(?:l|is)|atendo|atendemos|claro|"
+    r"pode ser|fa[cç]o|fazemos|combinado|beleza|ok|perfeito|com certeza)\b",
+    re.IGNORECASE,
+)
+
+MORNING_RE = re.compile(r"\b(manh[ãa]|cedo)\b")
+
+# Ressalvas ("sim, mas só semana que vem"): a resposta afirma com condição; a LLM decide.
+QUALIFIER_RE = re.compile(r"\b(mas|por[ée]m|s[óo]|somente|apenas|exceto|depende|a partir)\b", re.IGNORECASE)
+# Texto que fala de data, resolvido ou não por parse_date ("semana que vem", "depois do dia 20").
+DATE_HINT_RE = re.compile(
+    r"\b(semana que vem|pr[óo]xima semana|m[êe]s que vem|pr[óo]ximo m[êe]s|fim de semana|final de semana|"
+    r"dia \d{1,2}|hoje|amanh[ãa]|\d{1,2}[/-]\d{1,2})\b",
+    re.IGNORECASE,
+)
+
+DATE_ISO_RE = re.compile(r"\b(\d{4})[/-](\d{1,2})[/-](\d{1,2})\b")
+DATE_DMY_RE = re.compile(r"\b(\d{1,2})[/-](\d{1,2})(?:[/-](\d{2,4}))?\b")
+
+
+def tokenize(text: str) -> list[str]:
+    """Tokens em minúsculas, numa única passada (mantém palavras hifenizadas: 'quinta-feira')."""
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def find_weekday(text: str) -> int | None:
+    """Primeiro dia da semana citado no texto (0=segunda ... 6=domingo)."""
+    for tok in tokenize(text):
+        wd = WEEKDAY_MAP.get(tok)
+        if wd is None and "-" in tok:
+            wd = next((WEEKDAY_MAP[p] for p in tok.split("-") if p in WEEKDAY_MAP), None)
+        if wd is not None:
+            return wd
+    return None
+
+
+def next_weekday(base: date, wd: int) -> date:
+    d = (wd - base.weekday() + 7) % 7
+    return base + timedelta(days=d or 7)
+
+
+def safe_date(y: int, m: int, d: int) -> str | None:
+    try:
+        return date(y, m, d).isoformat()
+    except ValueError:
+        return None
+
+
+def relative_date(text: str, base: date) -> str | None:
+    """hoje / amanhã / depois de amanhã / dia da semana -> ISO, relativo a `base`."""
+    t = (text or "").lower()
+    if "depois de amanhã" in t or "depois de amanha" in t:
+        return (base + timedelta(days=2)).isoformat()
+    if "amanhã" in t or "amanha" in t:
+        return (base + timedelta(days=1)).isoformat()
+    if "hoje" in t:
+        return base.isoformat()
+    wd = find_weekday(t)
+    if wd is not None:
+        return next_weekday(base, wd).isoformat()
+    return None
+
+
+def parse_date(text: str, current_date: str | None) -> str | None:
+    """
+    Suporta:
+      - YYYY-MM-DD / YYYY/MM/DD
+      - dd/mm(/aa|aaaa)  (default)
+      - mm/dd(/aa|aaaa)  (heurística quando o 2º número > 12)
+      - amanhã / hoje / depois de amanhã
+      - nomes de dias da semana
+    """
+    t = (text or "").lower()
+    base = date.fromisoformat(current_date) if current_date else None
+
+    m_iso = DATE_ISO_RE.search(t)
+    if m_iso:
+        out = safe_date(int(m_iso.group(1)), int(m_iso.group(2)), int(m_iso.group(3)))
+        if out:
+            return out
+
+    m = DATE_DMY_RE.search(t)
+    if m:
+        a = int(m.group(1))
+        b = int(m.group(2))
+        ytxt = m.group(3)
+
+        if ytxt:
+            y = int(ytxt)
+            if y < 100:
+                y += 2000
+        else:
+            y = base.year if base else date.today().year
+
+        if b > 12 and a <= 12:
+            mth, day = a, b
+        else:
+            day, mth = a, b
+
+        out = safe_date(y, mth, day)
+        if out:
+            return out
+
+    if base:
+        return relative_date(t, base)
+    return None
+
+
+def infer_time_window(text: str) -> str | None:
+    t = (text or "").lower()
+    if MORNING_RE.search(t):  # com \b: "amanhã" não conta como "manhã"
+        return "morning"
+    if "tarde" in t:
+        return "afternoon"
+    if any(k in t for k in ["noite", "final do dia", "fim do dia"]):
+        return "evening"
+    return None
+
+
+def _to_float(amount: str) -> float | None:
+    a = amount
+    if "," in a:
+        a = a.replace(".", "").replace(",", ".")
+    elif re.fullmatch(r"\d{1,3}(?:\.\d{3})+", a):
+        a = a.replace(".", "")
+    try:
+        return float(a)
+    except ValueError:
+        return None
+
+
+def parse_price(text: str) -> float | None:
+    """Preço em BRL: 'R$ 1.234,56', 'R$80', '59,90 reais', '80 reais'."""
+    t = text or ""
+    m = PRICE_BRL_RE.search(t) or PRICE_REAIS_RE.search(t)
+    return _to_float(m.group(1)) if m else None
+
+
+def yes_no_intent(text: str) -> bool | None:
+    """True = afirmativo, False = negativo, None = ambíguo/ausente."""
+    t = text or ""
+    yes = bool(YES_RE.search(NEGATED_RE.sub(" ", t)))
+    no = bool(NO_RE.search(t))
+    if yes == no:
+        return None
+    return yes
+
+
+def has_negation(text: str) -> bool:
+    """Algum termo negativo ("não", "infelizmente", "esgotado"...), mesmo junto de um afirmativo."""
+    return bool(NO_RE.search(text or ""))
+
+
+def has_qualifier(text: str) -> bool:
+    """Ressalva na resposta: "mas", "só", "apenas", "a partir"..."""
+    return bool(QUALIFIER_RE.search(text or ""))
+
+
+def mentions_date(text: str) -> bool:
+    """Cita alguma data (dia da semana, "amanhã", "dia 20", "semana que vem", dd/mm)."""
+    return bool(DATE_HINT_RE.search(text or "")) or find_weekday(text) is not None
+
+
+def find_size(text: str) -> str | None:
+    """Tamanho cru (sem normalizar), respeitando a prioridade de SIZE_RES."""
+    t = (text or "").lower()
+    for rx in SIZE_RES:
+        m = rx.search(t)
+        if m:
+            return m.group(1)
+    return None
+
+
+def find_color(text: str) -> str | None:
+    m = COLOR_RE.search((text or "").lower())
+    return m.group(1) if m else None
+
+
+def is_pants(text: str) -> bool:
+    return bool(PANTS_RE.search((text or "").lower()))
@@ -0,0 +1,107 @@
+"""
+Templates de prompt com prefixo estável.
+
+O system prompt de um template depende só do tipo de serviço: instruções fixas +
+os exemplos daquele tipo. Assim ele é idêntico, byte a byte, em todas as chamadas
+do mesmo tipo e o Ollama reaproveita o prefixo já processado (com o modelo mantido
+carregado por OLLAMA_KEEP_ALIVE). Tudo o que varia vai na mensagem do usuário,
+reduzido aos campos que as instruções realmente usam.
+"""
+import json
+import threading
+
+
+def approx_tokens(text: str) -> int:
+    """Mesma estimativa do llm_client (~4 caracteres por token)."""
+    return len(text) // 4 + 1
+
+
+def compact_json(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class PromptTemplate:
+    def __init__(self, name: str, instructions: str, examples: dict[str, list[tuple[dict, str]]],
+                 fields: dict[str, tuple[str, ...]], max_examples: int = 3, closing: str = ""):
+        self.name = name
+        self.instructions = instructions.strip()
+        self.examples = examples
+        self.fields = fields
+        self.max_examples = max_examples
+        self.closing = closing.strip()
+        self._systems: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def project(self, payload: dict) -> dict:
+        """Mantém só os campos listados em `fields` (ex.: supplier sem inventory/working_days)."""
+        return {section: {k: (payload.get(section) or {}).get(k) for k in keys}
+                for section, keys in self.fields.items()}
+
+    def system(self, service_type: str | None) -> str:
+        key = service_type or ""
+        prompt = self._systems.get(key)
+        if prompt is None:
+            parts = [self.instructions]
+            shots = self.examples.get(key, [])[: self.max_examples]
+            if shots:
+                parts.append("Exemplos")
+                parts += [f"IN {compact_json(self.project(inp))}\nOUT {out}" for inp, out in shots]
+            if self.closing:
+                parts.append(self.closing)
+            prompt = "\n\n".join(parts)
+            with self._lock:
+                self._systems[key] = prompt
+        return prompt
+
+    def render(self, payload: dict, service_type: str | None = None) -> tuple[str, str]:
+        """(system, user) prontos para LLMClient.ask/stream."""
+        stype = service_type or (payload.get("task") or {}).get("service_type")
+        return self.system(stype), compact_json(self.project(payload))
+
+
+SUPPLIER_QUESTION = PromptTemplate(
+    "supplier_question",
+    instructions="""
+Você é um atendente que pergunta ao fornecedor exatamente sobre a tarefa que o cliente descreveu.
+Entrada: JSON com "task" e "supplier". Saída: uma única pergunta em pt-BR, uma frase, sem markdown, aspas ou asteriscos, máx. 200 caracteres, com exatamente um "?".
+Regras:
+- Use apenas o que estiver no JSON; não invente.
+- tshirt_sale => "camiseta"; pants_sale => "calça".
+- Se color/size existirem, mencione-os exatamente como vieram; se faltarem, pergunte quais estão disponíveis.
+- Sempre pergunte o preço.
+- desired_date (YYYY-MM-DD) => "no dia DD/MM/AAAA"; time_window: morning => "de manhã", afternoon => "à tarde", evening => "à noite".
+- Se supplier.name existir, comece com "Olá {nome}, ...".
+- Não peça telefone, e-mail, link, desconto ou dados pessoais.
+""",
+    examples={
+        "tshirt_sale": [
+            ({"task": {"service_type": "tshirt_sale", "color": "preta", "size": "GG", "desired_date": "2025-08-14", "time_window": "afternoon"},
+              "supplier": {"name": "Loja Camiseta 1"}},
+             "Olá Loja Camiseta 1, você tem camiseta preta tamanho GG no dia 14/08/2025 à tarde e qual é o preço?"),
+            ({"task": {"service_type": "tshirt_sale", "color": "azul", "size": "42", "desired_date": None, "time_window": "morning"},
+              "supplier": {"name": "Loja Camiseta 7"}},
+             "Olá Loja Camiseta 7, você tem camiseta azul tamanho 42 de manhã e qual é o preço?"),
+            ({"task": {"service_type": "tshirt_sale", "color": None, "size": None, "desired_date": None, "time_window": None},
+              "supplier": {"name": "Loja Camiseta 3"}},
+             "Olá Loja Camiseta 3, você tem camiseta e quais cores e tamanhos disponíveis e qual é o preço?"),
+        ],
+        "pants_sale": [
+            ({"task": {"service_type": "pants_sale", "color": "branca", "size": "M", "desired_date": "2025-09-02", "time_window": None},
+              "supplier": {"name": "Loja Calça 5"}},
+             "Olá Loja Calça 5, você tem calça branca tamanho M no dia 02/09/2025 e qual é o preço?"),
+            ({"task": {"service_type": "pants_sale", "color": None, "size": None, "desired_date": None, "time_window": None},
+              "supplier": {"name": "Loja Calça 2"}},
+             "Olá Loja Calça 2, você tem calça e quais cores e tamanhos disponíveis e qual é o preço?"),
+        ],
+        "faucet_repair": [
+            ({"task": {"service_type": "faucet_repair", "desired_date": "2025-08-14", "time_window": "afternoon"},
+              "supplier": {"name": "João Encanador 1"}},
+             "Olá João Encanador 1, você consegue consertar uma torneira pingando na quinta-feira (14/08/2025) à tarde? Qual seria o preço?"),
+            ({"task": {"service_type": "faucet_repair", "desired_date": None, "time_window": None},
+              "supplier": {"name": "João Encanador 4"}},
+             "Olá João Encanador 4, você consegue consertar uma torneira pingando? Se sim, quando e qual seria o preço?"),
+        ],
+    },
+    fields={"task": ("service_type", "color", "size", "desired_date", "time_window"), "supplier": ("name",)},
+    closing="Responda somente a pergunta final.",
+)
@@ -0,0 +1,103 @@
+"""
+API headless das sessões de orçamento sobre o grafo completo (workflow.build_quote_graph).
+
+    sessions = QuoteSessions()
+    view = sessions.start("Minha torneira está pingando, consegue amanhã de manhã?")
+    while not view["done"]:
+        view = sessions.reply(view["run_id"], input(view["question"] + "\\n> "))
+    print(view["message"])
+
+Com on_question=<callable> a pergunta de cada fornecedor é entregue parcial enquanto é
+gerada (stream_mode="custom" do LangGraph); o estado da sessão continua o mesmo.
+
+Cada sessão é um thread do LangGraph (thread_id = run_id). Com CHECKPOINT_BACKEND=sqlite
+ou mongo, qualquer processo que tenha o run_id pode continuar a conversa.
+
+    python quote_sessions.py "Quero uma camiseta preta tamanho M"
+"""
+import sys
+import uuid
+from datetime import date
+from resources import get_quote_graph
+from tracing import run_context
+
+
+class QuoteSessions:
+    def __init__(self, graph=None):
+        self.graph = graph or get_quote_graph()
+
+    def _config(self, run_id: str) -> dict:
+        return {"configurable": {"thread_id": run_id}}
+
+    def _invoke(self, run_id: str, payload, on_question=None) -> dict:
+        with run_context(run_id):
+            if on_question is None:
+                self.graph.invoke(payload, self._config(run_id))
+            else:
+                for chunk in self.graph.stream(payload, self._config(run_id), stream_mode="custom"):
+                    if isinstance(chunk, dict) and "question_partial" in chunk:
+                        on_question(chunk["question_partial"])
+        return self.status(run_id)
+
+    def start(self, task_text: str, current_date: str | None = None, run_id: str | None = None,
+              on_question=None) -> dict:
+        run_id = run_id or str(uuid.uuid4())
+        state = {"task_text": task_text, "current_date": current_date or date.today().isoformat(), "run_id": run_id}
+        return self._invoke(run_id, state, on_question)
+
+    def _resume(self, run_id: str, value, on_question=None) -> dict:
+        from langgraph.types import Command
+        return self._invoke(run_id, Command(resume=value), on_question)
+
+    def reply(self, run_id: str, answer: str, on_question=None) -> dict:
+        """Entrega a resposta do fornecedor atual e avança até a próxima pergunta (ou o orçamento)."""
+        return self._resume(run_id, answer, on_question)
+
+    def skip(self, run_id: str, on_question=None) -> dict:
+        return self._resume(run_id, {"action": "skip"}, on_question)
+
+    def finish(self, run_id: str) -> dict:
+        """Para de contatar fornecedores e gera o orçamento com as ofertas que já existem."""
+        return self._resume(run_id, {"action": "finish"})
+
+    def status(self, run_id: str) -> dict:
+        snap = self.graph.get_state(self._config(run_id))
+        values = snap.values or {}
+        pending = snap.interrupts[0].value if snap.interrupts else None
+        suppliers, cursor = values.get("suppliers") or [], values.get("cursor") or 0
+        return {
+            "run_id": run_id,
+            "done": not snap.next,
+            "category": values.get("category"),
+            "task": values.get("task"),
+            "supplier": pending.get("supplier") if pending else None,
+            "question": pending.get("question") if pending else None,
+            "offers": values.get("offers") or [],
+            # conversa com o fornecedor atual e os próximos da fila (a UI adianta as perguntas deles)
+            "transcript": values.get("transcript") or [] if pending else [],
+            "upcoming": suppliers[cursor:] if snap.next else [],
+            "message": values.get("message"),
+        }
+
+
+def main(argv: list[str]):
+    if not argv:
+        print('usage: python quote_sessions.py "<tarefa>"')
+        return
+    sessions = QuoteSessions()
+    view = sessions.start(" ".join(argv))
+    while not view["done"]:
+        sup = view["supplier"] or {}
+        print(f"\n[{sup.get('name')}] {view['question']}")
+        answer = input("resposta (vazio = pular, /fim = gerar orçamento): ").strip()
+        if answer == "/fim":
+            view = sessions.finish(view["run_id"])
+        elif not answer:
+            view = sessions.skip(view["run_id"])
+        else:
+            view = sessions.reply(view["run_id"], answer)
+    print("\n" + (view["message"] or ""))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
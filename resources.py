@@ -0,0 +1,75 @@
+"""
+Recursos compartilhados pelo processo inteiro: grafo compilado, nós e clientes.
+
+O Streamlit reexecuta o script a cada interação, mas os módulos importados ficam
+em sys.modules; por isso as fábricas abaixo (lru_cache) constroem cada objeto uma
+única vez e todas as sessões passam a usar a mesma instância. Os nós não guardam
+estado de sessão (só contadores em `stats`) e o grafo compilado é reentrante.
+"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_workflow():
+    from workflow import build_workflow
+    return build_workflow()
+
+
+@lru_cache(maxsize=None)
+def get_quote_graph():
+    """Grafo completo (com contato e orçamento) usando o checkpointer de CHECKPOINT_BACKEND."""
+    from checkpointing import make_checkpointer
+    from workflow import build_quote_graph
+    return build_quote_graph(make_checkpointer())
+
+
+@lru_cache(maxsize=None)
+def get_question_node():
+    from nodes.supplier_question_node import SupplierQuestionNode
+    return SupplierQuestionNode()
+
+
+@lru_cache(maxsize=None)
+def get_answer_node():
+    from nodes.supplier_answer_parser_node import SupplierAnswerParserNode
+    return SupplierAnswerParserNode()
+
+
+@lru_cache(maxsize=None)
+def get_followup_node():
+    from nodes.supplier_followup_node import SupplierFollowupNode
+    return SupplierFollowupNode()
+
+
+@lru_cache(maxsize=None)
+def get_budget_node():
+    from nodes.budget_generator_node import BudgetGeneratorNode
+    return BudgetGeneratorNode()
+
+
+def get_db():
+    from db.mongo import db
+    return db
+
+
+def get_llm():
+    from llm_client import get_llm_client
+    return get_llm_client()
+
+
+def warm_up():
+    """Constrói tudo de uma vez (ex.: no início do processo, antes da primeira sessão)."""
+    get_llm()
+    get_db()
+    get_workflow()
+    get_question_node()
+    get_answer_node()
+    get_followup_node()
+    get_budget_node()
+
+
+def reset():
+    """Descarta as instâncias em cache (ex.: depois de trocar variáveis de ambiente em benchmarks)."""
+    for factory in (get_workflow, get_quote_graph, get_question_node, get_answer_node,
+                    get_followup_node, get_budget_node):
+        factory.cache_clear()
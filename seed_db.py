@@ -1,10 +1,35 @@
 import json
+import sys
+from categories import registry
 from db.mongo import db
-def seed():
-    with open('data/suppliers_seed.json','r',encoding='utf-8') as f:
+from db.supplier_catalog import SUPPLIER_COLLECTION, canonical_supplier, catalog
+from db.writer import ensure_indexes
+
+def seed_docs(path: str = 'data/suppliers_seed.json') -> list[dict]:
+    with open(path,'r',encoding='utf-8') as f:
         payload=json.load(f)
-    for col in ['suppliers_faucet','suppliers_tshirt','suppliers_pants']:
-        db[col].delete_many({})
-        db[col].insert_many(payload[col])
-    print('✅ Seed data inserted.')
-if __name__=='__main__': seed()
+    # o seed ainda vem agrupado pelas coleções antigas; tudo vai para a coleção única
+    return [canonical_supplier(d) for docs in payload.values() for d in docs]
+
+def seed(path: str = 'data/suppliers_seed.json', quiet: bool = False):
+    db[SUPPLIER_COLLECTION].delete_many({})
+    db[SUPPLIER_COLLECTION].insert_many(seed_docs(path))
+    ensure_indexes()
+    catalog.invalidate()
+    if not quiet:
+        print('✅ Seed data inserted.')
+
+def migrate():
+    """Copia suppliers_faucet/_tshirt/_pants para `suppliers` (upsert por id); as antigas ficam intactas."""
+    total = 0
+    for stype, col in registry.legacy_collections().items():
+        for d in db[col].find({}, {'_id': 0}):
+            d.setdefault('service_type', stype)
+            db[SUPPLIER_COLLECTION].replace_one({'id': d['id']}, canonical_supplier(d), upsert=True)
+            total += 1
+    ensure_indexes()
+    catalog.invalidate()
+    print(f'✅ {total} supplier(s) migrated to {SUPPLIER_COLLECTION}.')
+
+if __name__=='__main__':
+    migrate() if '--migrate' in sys.argv else seed()
@@ -1,108 +1,94 @@
-import uuid
 import streamlit as st
-from datetime import date
-from workflow import build_workflow
-from nodes.supplier_question_node import SupplierQuestionNode
-from nodes.supplier_answer_parser_node import SupplierAnswerParserNode
-from nodes.budget_generator_node import BudgetGeneratorNode
+from quote_sessions import QuoteSessions
+from resources import get_question_node
+from tracing import run_context
 
 st.set_page_config(page_title="Intelligent Quotation System", page_icon="🧠")
 st.title("🧠 Intelligent Quotation System")
 
-if "graph" not in st.session_state:
-    st.session_state.graph = build_workflow()
-if "phase" not in st.session_state:
-    st.session_state.phase = "form" # onde está o fluxo ("form", "supplier_chat", "budget")
-if "queue" not in st.session_state:
-    st.session_state.queue = [] # fila de fornecedores a serem contatados
-if "offers" not in st.session_state:
-    st.session_state.offers = [] # lista de ofertas aceitas
-if "task" not in st.session_state:
-    st.session_state.task = {} # dicionário da tarefa normalizada
-if "current_supplier" not in st.session_state:
-    st.session_state.current_supplier = None # fornecedor atual que estamos conversando
-if "generated_question" not in st.session_state:
-    st.session_state.generated_question = "" # Pergunta exibida para o fornecedor
-if "answer_key" not in st.session_state:
-    st.session_state.answer_key = 0 # contador que limpa o input entre fornecedores
 if "run_id" not in st.session_state:
-    st.session_state.run_id = None #ID de cada execução (para rastrear/persistir no Mongo)
-
-qnode = SupplierQuestionNode()
-anode = SupplierAnswerParserNode()
-bnode = BudgetGeneratorNode()
-
-def start_flow(task_text: str):
-    today = date.today().isoformat()
-    res = st.session_state.graph.invoke({"task_text": task_text, "current_date": today})
-
-    st.session_state.run_id = str(uuid.uuid4())
-
-    st.session_state.task = res.get("task") or res.get("normalized_task") or {}
-    st.session_state.task["run_id"] = st.session_state.run_id
-    st.session_state.task["current_date"] = today
-
-    st.session_state.queue = res.get("suppliers", [])
-    st.session_state.offers = []
-    st.session_state.current_supplier = None
-    st.session_state.generated_question = ""
-    st.session_state.answer_key += 1          
-    st.session_state.phase = "supplier_chat"
+    st.session_state.run_id = None # sessão de orçamento no grafo (thread_id do checkpointer)
+if "view" not in st.session_state:
+    st.session_state.view = None # último QuoteSessions.status() da sessão
+if "answer_key" not in st.session_state:
+    st.session_state.answer_key = 0 # contador que limpa o input entre perguntas
+if "notice" not in st.session_state:
+    st.session_state.notice = None # resultado do último fornecedor, mostrado após o rerun
+
+# O fluxo (fornecedores, follow-ups, pular, orçamento) é o grafo de workflow.build_quote_graph;
+# a UI só entrega as ações e exibe o estado. Grafo e nós são compartilhados (ver resources.py).
+sessions = QuoteSessions()
+qnode = get_question_node()
+
+def stream_into(box):
+    """Mostra a pergunta enquanto o grafo a gera (on_question do QuoteSessions)."""
+    return lambda partial: box.write(f"Pergunta: \"{partial}\"")
+
+def prefetch_upcoming(view: dict):
+    # Os próximos fornecedores da fila têm a pergunta gerada em paralelo; o nó da pergunta usa
+    # o resultado quando o grafo chegar neles (ou transmite, se ainda não começou).
+    if view["upcoming"]:
+        with run_context(view["run_id"]):
+            qnode.prefetch(view["task"] or {}, view["upcoming"])
+
+def show(view: dict):
+    st.session_state.view = view
+    st.session_state.answer_key += 1
+    if view["done"]:
+        qnode.cancel_prefetch(view["run_id"])
 
 with st.form("form"):
     task_text = st.text_area("Describe your task:", key="task_input", placeholder="Escreva sua tarefa:")
     submitted = st.form_submit_button("Generate quotation")
 if submitted and task_text.strip():
-    start_flow(task_text.strip())
-
-def ensure_current():
-    if st.session_state.current_supplier is None and st.session_state.queue:
-        st.session_state.current_supplier = st.session_state.queue.pop(0)
-        st.session_state.generated_question = qnode.run(st.session_state.task, st.session_state.current_supplier)
-        st.session_state.answer_key += 1       
-
-if st.session_state.phase == "supplier_chat":
+    qnode.cancel_prefetch(st.session_state.run_id)
+    st.session_state.notice = None
+    view = sessions.start(task_text.strip(), on_question=stream_into(st.empty()))
+    st.session_state.run_id = view["run_id"]
+    show(view)
+    prefetch_upcoming(view)
+    st.rerun()
+
+view = st.session_state.view
+if st.session_state.notice:
+    kind, text = st.session_state.notice
+    getattr(st, kind)(text)
+    st.session_state.notice = None
+
+if view and not view["done"]:
     st.subheader("Contato com fornecedores")
-    ensure_current()
-    sup = st.session_state.current_supplier
-
-    if not sup:
-        st.info("Fila de fornecedores esgotada.")
-        st.session_state.phase = "budget"
-    else:
-        st.markdown(f"**Supplier:** {sup.get('name')} — {sup.get('location','-')} (id: {sup.get('id','-')})")
-        st.write(f"Pergunta: \"{st.session_state.generated_question}\"")
-
-        answer_widget_key = f"supplier_answer_{st.session_state.answer_key}"
-        st.text_input("Resposta do fornecedor:", key=answer_widget_key)
-
-        c1, c2, c3 = st.columns(3)
-        with c1:
-            if st.button("Enviar resposta"):
-                answer = (st.session_state.get(answer_widget_key) or "").strip()
-                out = anode.run(st.session_state.task, sup, answer)
-                if out.get("accepted") and out.get("offer"):
-                    st.session_state.offers.append(out["offer"])
-                    st.success("Fornecedor aceito.")
-                else:
-                    st.info("Fornecedor não atende ou não forneceu preço.")
-                st.session_state.current_supplier = None
-                st.session_state.generated_question = ""
-                if len(st.session_state.offers) >= 3 or not st.session_state.queue:
-                    st.session_state.phase = "budget"
-                st.rerun()
-
-        with c2:
-            if st.button("Pular fornecedor"):
-                st.session_state.current_supplier = None
-                st.session_state.generated_question = ""
-                st.rerun()
-
-        with c3:
-            if st.button("Encerrar e gerar orçamento"):
-                st.session_state.phase = "budget"
-                st.rerun()
-
-if st.session_state.phase == "budget":
-    result = bnode.run({"offers": st.session_state.offers, "task": st.session_state.task})
-    st.markdown(result.get("message", ""))
+    sup = view["supplier"] or {}
+    st.markdown(f"**Supplier:** {sup.get('name')} — {sup.get('location') or '-'} (id: {sup.get('id') or '-'})")
+    for msg in view["transcript"][:-1]:
+        st.caption(("Fornecedor: " if msg["role"] == "supplier" else "Pergunta: ") + msg["content"])
+    question_box = st.empty()
+    question_box.write(f"Pergunta: \"{view['question']}\"")
+
+    answer_widget_key = f"supplier_answer_{st.session_state.answer_key}"
+    st.text_input("Resposta do fornecedor:", key=answer_widget_key)
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        if st.button("Enviar resposta"):
+            answer = (st.session_state.get(answer_widget_key) or "").strip()
+            new = sessions.reply(view["run_id"], answer, on_question=stream_into(question_box))
+            if len(new["offers"]) > len(view["offers"]):
+                st.session_state.notice = ("success", "Fornecedor aceito.")
+            elif new["done"] or (new["supplier"] or {}).get("id") != sup.get("id"):
+                st.session_state.notice = ("info", "Fornecedor não atende ou não forneceu preço.")
+            # mesmo fornecedor e sem oferta: faltou informação, a pergunta agora é o follow-up
+            show(new)
+            st.rerun()
+
+    with c2:
+        if st.button("Pular fornecedor"):
+            show(sessions.skip(view["run_id"], on_question=stream_into(question_box)))
+            st.rerun()
+
+    with c3:
+        if st.button("Encerrar e gerar orçamento"):
+            show(sessions.finish(view["run_id"]))
+            st.rerun()
+
+if view and view["done"]:
+    st.markdown(view["message"] or "")
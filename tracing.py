@@ -0,0 +1,204 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "1") not in {"0", "false", "no"}
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH")            # JSON lines; sem isso, só o logger "quote.trace"
+TRACE_PROM_FILE = os.getenv("TRACE_PROM_FILE")          # arquivo texto no formato Prometheus (node_exporter textfile)
+TRACE_PROM_PORT = int(os.getenv("TRACE_PROM_PORT", "0"))  # >0 sobe um endpoint /metrics
+TRACE_MAX_RUNS = int(os.getenv("TRACE_MAX_RUNS", "1000"))
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+log = logging.getLogger("quote.trace")
+current_run_id: contextvars.ContextVar[str | None] = contextvars.ContextVar("run_id", default=None)
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.sum += seconds
+        self.count += 1
+        for i, b in enumerate(BUCKETS):
+            if seconds <= b:
+                self.counts[i] += 1
+
+
+class Tracer:
+    """
+    Coleta eventos por run_id (nós do workflow, chamadas à LLM, cache, Mongo)
+    e agrega métricas exportáveis em texto Prometheus.
+    """
+
+    def __init__(self, enabled: bool = TRACE_ENABLED, max_runs: int = TRACE_MAX_RUNS):
+        self.enabled = enabled
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._runs: OrderedDict[str, list[dict]] = OrderedDict()
+        self._hist: dict[tuple[str, tuple], _Histogram] = {}
+        self._counters: dict[tuple[str, tuple], float] = {}
+
+    def _labels(self, **labels) -> tuple:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, metric: str, value: float = 1.0, **labels):
+        if not self.enabled:
+            return
+        key = (metric, self._labels(**labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, metric: str, seconds: float, **labels):
+        if not self.enabled:
+            return
+        key = (metric, self._labels(**labels))
+        with self._lock:
+            self._hist.setdefault(key, _Histogram()).observe(seconds)
+
+    def event(self, kind: str, name: str, duration_ms: float | None = None, **fields):
+        """Registra um evento estruturado no run atual e no logger."""
+        if not self.enabled:
+            return
+        ev = {"ts": time.time(), "run_id": current_run_id.get(), "kind": kind, "name": name}
+        if duration_ms is not None:
+            ev["duration_ms"] = round(duration_ms, 3)
+        ev.update(fields)
+        if ev["run_id"]:
+            with self._lock:
+                self._runs.setdefault(ev["run_id"], []).append(ev)
+                self._runs.move_to_end(ev["run_id"])
+                while len(self._runs) > self.max_runs:
+                    self._runs.popitem(last=False)
+        if log.isEnabledFor(logging.INFO):
+            log.info(json.dumps(ev, ensure_ascii=False, default=str))
+
+    @contextmanager
+    def span(self, kind: str, name: str, **fields):
+        """Mede o bloco; alimenta o histograma quote_<kind>_seconds{name=...}."""
+        t0 = time.perf_counter()
+        status = "ok"
+        try:
+            yield fields
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            dt = time.perf_counter() - t0
+            self.observe(f"quote_{kind}_seconds", dt, name=name)
+            self.event(kind, name, dt * 1000, status=status, **fields)
+
+    def run_events(self, run_id: str) -> list[dict]:
+        with self._lock:
+            return list(self._runs.get(run_id, []))
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            hists = {k: (list(h.counts), h.sum, h.count) for k, h in self._hist.items()}
+
+        def fmt(labels: tuple, extra: tuple = ()) -> str:
+            items = list(labels) + list(extra)
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}" if items else ""
+
+        lines = []
+        seen = set()
+        for (metric, labels), v in sorted(counters.items()):
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{fmt(labels)} {v}")
+        for (metric, labels), (counts, total, n) in sorted(hists.items()):
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} histogram")
+                seen.add(metric)
+            for b, c in zip(BUCKETS, counts):
+                lines.append(f"{metric}_bucket{fmt(labels, (('le', b),))} {c}")
+            lines.append(f"{metric}_bucket{fmt(labels, (('le', '+Inf'),))} {n}")
+            lines.append(f"{metric}_sum{fmt(labels)} {total}")
+            lines.append(f"{metric}_count{fmt(labels)} {n}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def serve(self, port: int):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        tracer = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("0.0.0.0", port), _Handler)
+        threading.Thread(target=server.serve_forever, name="trace-metrics", daemon=True).start()
+        return server
+
+
+@contextmanager
+def run_context(run_id: str | None):
+    token = current_run_id.set(run_id or current_run_id.get())
+    try:
+        yield
+    finally:
+        current_run_id.reset(token)
+
+
+def traced_node(name: str, fn):
+    """Envolve um nó do LangGraph: mede o tempo e propaga o run_id do estado para a saída."""
+    def wrapper(state):
+        run_id = state.get("run_id")
+        with run_context(run_id), tracer.span("node", name):
+            out = fn(state)
+        if run_id and isinstance(out, dict):
+            out.setdefault("run_id", run_id)
+        return out
+    return wrapper
+
+
+tracer = Tracer()
+
+if TRACE_LOG_PATH:
+    _handler = logging.FileHandler(TRACE_LOG_PATH, encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+if TRACE_PROM_PORT:
+    try:
+        tracer.serve(TRACE_PROM_PORT)
+    except OSError:
+        log.warning("trace metrics port %s already in use", TRACE_PROM_PORT)  # ex.: reexecução do Streamlit
+
+if TRACE_PROM_FILE:
+    def _flush_loop():
+        while True:
+            time.sleep(15)
+            tracer.write_prometheus(TRACE_PROM_FILE)
+
+    threading.Thread(target=_flush_loop, name="trace-prom-file", daemon=True).start()
+    atexit.register(tracer.write_prometheus, TRACE_PROM_FILE)
@@ -0,0 +1,129 @@
+"""
+Treina o classificador de intenção local (nodes/intent_model.py) com o histórico de db.quotes.
+
+    python train_intent.py                       # relatório no holdout + salva em INTENT_MODEL_PATH
+    python train_intent.py --holdout 0.3 --threshold 0.95 --no-save
+
+Cada orçamento traz o texto do pedido (task.task_text; em registros antigos, task.description)
+e o service_type final. O relatório compara, no mesmo holdout, a heurística do ClassifierNode,
+o modelo e a cadeia heurística -> modelo (quanto sobra para a LLM), com latência por previsão.
+Depois do relatório o modelo é treinado de novo com todos os exemplos e salvo.
+"""
+import argparse
+import random
+import sys
+import time
+from statistics import quantiles
+from categories import registry
+from db.mongo import db
+from nodes.classifier_node import CLASSIFIER_MIN_CONFIDENCE, INTENT_MODEL_MIN_PROBA, keyword_score
+from nodes.intent_model import INTENT_MODEL_PATH, IntentModel, coverage_errors, normalize
+
+
+def load_history(limit: int | None = None) -> list[tuple[str, str]]:
+    """[(texto, service_type)], um por texto normalizado (vale o orçamento mais recente)."""
+    cursor = db.quotes.find({"task.service_type": {"$in": list(registry.service_types)}},
+                            {"task.task_text": 1, "task.description": 1, "task.service_type": 1}).sort("created_at", -1)
+    if limit:
+        cursor = cursor.limit(limit)
+    samples: dict[str, tuple[str, str]] = {}
+    for q in cursor:
+        task = q.get("task") or {}
+        text = task.get("task_text") or task.get("description")
+        if text and normalize(text) not in samples:
+            samples[normalize(text)] = (text, task["service_type"])
+    return list(samples.values())
+
+
+def split(samples: list[tuple[str, str]], holdout: float, seed: int) -> tuple[list, list]:
+    rng = random.Random(seed)
+    shuffled = samples[:]
+    rng.shuffle(shuffled)
+    cut = int(len(shuffled) * (1 - holdout))
+    return shuffled[:cut], shuffled[cut:]
+
+
+def _pct(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def evaluate(model: IntentModel, test: list[tuple[str, str]], threshold: float,
+             min_confidence: float = CLASSIFIER_MIN_CONFIDENCE) -> dict:
+    rows = {"heuristic": [], "model": [], "chain": []}   # (decidiu?, acertou?)
+    service_hits, latency_us = 0, []
+    for text, service_type in test:
+        category = registry.category_of(service_type)
+        h_label, h_conf = keyword_score(text)
+        rows["heuristic"].append((h_conf >= min_confidence, h_label == category))
+
+        t0 = time.perf_counter()
+        m_label, m_proba = model.predict_category(text)
+        latency_us.append((time.perf_counter() - t0) * 1e6)
+        service_hits += model.predict(text)[0] == service_type
+        rows["model"].append((m_proba >= threshold, m_label == category))
+
+        if h_conf >= min_confidence:
+            rows["chain"].append((True, h_label == category))
+        else:
+            rows["chain"].append((m_proba >= threshold, m_label == category))
+
+    report = {"samples": len(test), "service_type_accuracy": service_hits / len(test) if test else 0.0,
+              "latency_us_p50": _pct(latency_us, 50), "latency_us_p95": _pct(latency_us, 95)}
+    for name, decided in rows.items():
+        covered = [ok for d, ok in decided if d]
+        report[name] = {"coverage": len(covered) / len(decided) if decided else 0.0,
+                        "accuracy": sum(covered) / len(covered) if covered else 0.0,
+                        "accuracy_all": sum(ok for _, ok in decided) / len(decided) if decided else 0.0}
+    return report
+
+
+def print_report(r: dict, threshold: float):
+    print(f"holdout: {r['samples']} pedidos  threshold: {threshold}")
+    print(f"{'path':<12}{'coverage':>10}{'acc (decided)':>15}{'acc (all)':>11}")
+    for name in ("heuristic", "model", "chain"):
+        row = r[name]
+        print(f"{name:<12}{row['coverage']:>10.1%}{row['accuracy']:>15.1%}{row['accuracy_all']:>11.1%}")
+    print(f"service_type accuracy (model): {r['service_type_accuracy']:.1%}")
+    print(f"llm calls left (chain): {1 - r['chain']['coverage']:.1%} of requests")
+    print(f"model latency: p50 {r['latency_us_p50']:.1f} us  p95 {r['latency_us_p95']:.1f} us")
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Treina o classificador de intenção com db.quotes.")
+    ap.add_argument("--holdout", type=float, default=0.2)
+    ap.add_argument("--seed", type=int, default=13)
+    ap.add_argument("--alpha", type=float, default=0.5, help="suavização de Laplace")
+    ap.add_argument("--threshold", type=float, default=INTENT_MODEL_MIN_PROBA)
+    ap.add_argument("--min-samples", type=int, default=30, help="não salva com menos exemplos")
+    ap.add_argument("--min-per-category", type=int, default=10,
+                    help="exemplos mínimos de cada categoria do registro")
+    ap.add_argument("--limit", type=int, default=None, help="usa só os N orçamentos mais recentes")
+    ap.add_argument("--out", default=INTENT_MODEL_PATH)
+    ap.add_argument("--no-save", action="store_true")
+    args = ap.parse_args(argv)
+
+    samples = load_history(args.limit)
+    if len(samples) < args.min_samples:
+        print(f"only {len(samples)} labelled request(s) in db.quotes; need {args.min_samples}")
+        return 1
+    errors = coverage_errors([l for _, l in samples], args.min_per_category)
+    if errors:
+        print("not training: " + "; ".join(errors))
+        return 1
+    train, test = split(samples, args.holdout, args.seed)
+    report = evaluate(IntentModel.fit([t for t, _ in train], [l for _, l in train], alpha=args.alpha), test,
+                      args.threshold)
+    print_report(report, args.threshold)
+
+    if not args.no_save:
+        model = IntentModel.fit([t for t, _ in samples], [l for _, l in samples], alpha=args.alpha)
+        model.meta["holdout"] = {k: report[k] for k in ("samples", "service_type_accuracy", "model", "chain")}
+        model.save(args.out)
+        print(f"saved {args.out} ({model.meta['samples']} samples, {model.meta['vocab']} n-grams)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,34 +1,171 @@
-from langgraph.graph import StateGraph, START, END
+import os
+from typing import TypedDict
+from categories import registry
+from db.supplier_stats import record_outcome
 from nodes.classifier_node import ClassifierNode
 from nodes.manual_normalizer_node import ManualNormalizerNode
 from nodes.clothing_normalizer_node import ClothingNormalizerNode
-from nodes.faucet_service_node import FaucetServiceNode
-from nodes.tshirt_service_node import TshirtServiceNode
-from nodes.pants_service_node import PantsServiceNode
+from nodes.service_common import QUOTE_MAX_OFFERS
+from nodes.service_node import ServiceNode
+from nodes.supplier_conversation import SupplierConversation
+from nodes.task_extractor_node import TaskExtractorNode
+from tracing import traced_node
 
-def build_workflow():
-    g=StateGraph(dict)
-    classifier=ClassifierNode(); mnorm=ManualNormalizerNode(); cnorm=ClothingNormalizerNode()
-    faucet=FaucetServiceNode(); tshirt=TshirtServiceNode(); pants=PantsServiceNode()
-    
-    def klass(state): 
+# two_step: classificador + normalizador; fused: uma chamada só (TaskExtractorNode), com fallback para two_step
+WORKFLOW_MODE = os.getenv("WORKFLOW_MODE", "two_step")
+
+# nome do normalizador no registro (data/categories.json) -> classe
+NORMALIZERS = {'manual_normalizer': ManualNormalizerNode, 'clothing_normalizer': ClothingNormalizerNode}
+
+def _normalizer_fn(node):
+    def fn(state): return {'normalized_task': node.run(state['original_task'], state.get('current_date'))}
+    return fn
+
+def _lookup_nodes(mode: str):
+    classifier=ClassifierNode(); service=ServiceNode()
+
+    def klass(state):
         out=classifier.run(state['task_text']); out['task_text']=state['task_text']
         if 'current_date' in state: out['current_date']=state['current_date']
         return out
-    def mfn(state): return {'normalized_task': mnorm.run(state['original_task'], state.get('current_date'))}
-    def cfn(state): return {'normalized_task': cnorm.run(state['original_task'], state.get('current_date'))}
-    def ffn(state): out=faucet.run(state['normalized_task']); return {'task':out['task'],'suppliers':out['suppliers']}
-    def tfn(state): out=tshirt.run(state['normalized_task']); return {'task':out['task'],'suppliers':out['suppliers']}
-    def pfn(state): out=pants.run(state['normalized_task']); return {'task':out['task'],'suppliers':out['suppliers']}
-    
-    g.add_node('classifier', klass); g.add_node('manual_normalizer', mfn); g.add_node('clothing_normalizer', cfn)
-    g.add_node('faucet_service', ffn); g.add_node('tshirt_service', tfn); g.add_node('pants_service', pfn)
-    
-    g.add_edge(START,'classifier')
-    g.add_conditional_edges('classifier', lambda s: s.get('category','manual_process'),
-        {'manual_process':'manual_normalizer','clothing':'clothing_normalizer'})
-    g.add_conditional_edges('manual_normalizer', lambda s: (s.get('normalized_task') or {}).get('service_type'),
-        {'faucet_repair':'faucet_service'})
-    g.add_conditional_edges('clothing_normalizer', lambda s: (s.get('normalized_task') or {}).get('service_type'),
-        {'tshirt_sale':'tshirt_service','pants_sale':'pants_service'})
+    def sfn(state): out=service.run(state['normalized_task']); return {'task':out['task'],'suppliers':out['suppliers']}
+
+    nodes = [('classifier', klass), *[(name, _normalizer_fn(NORMALIZERS[name]())) for name in registry.normalizers()],
+             ('service', sfn)]
+    if mode == 'fused':
+        extractor = TaskExtractorNode()
+        def xfn(state):
+            # Sem resultado válido, repassa o texto para o classificador (caminho de duas etapas).
+            out = {'task_text': state['task_text'], 'original_task': state['task_text']}
+            if 'current_date' in state: out['current_date'] = state['current_date']
+            res = extractor.run(state['task_text'], state.get('current_date'))
+            if res:
+                out.update(res, classifier_path='fused')
+            return out
+        nodes.insert(0, ('task_extractor', xfn))
+    return nodes
+
+def _lookup_edges(g, mode: str):
+    from langgraph.graph import START
+    if mode == 'fused':
+        g.add_edge(START,'task_extractor')
+        g.add_conditional_edges('task_extractor',
+            lambda s: 'service' if s.get('normalized_task') else 'classifier', ['classifier', 'service'])
+    else:
+        g.add_edge(START,'classifier')
+    # categoria -> normalizador -> service, tudo a partir do registro
+    g.add_conditional_edges('classifier', lambda s: registry.normalizer_of(s.get('category')), registry.normalizers())
+    for name in registry.normalizers():
+        g.add_edge(name, 'service')
+
+def build_workflow(mode: str | None = None):
+    """Classificação -> normalização -> busca de fornecedores (sem contato)."""
+    from langgraph.graph import StateGraph   # import pesado (~1s): só quando o grafo é construído
+    mode = mode or WORKFLOW_MODE
+    g=StateGraph(dict)
+    for name, fn in _lookup_nodes(mode):
+        g.add_node(name, traced_node(name, fn))
+    _lookup_edges(g, mode)
     return g.compile()
+
+
+class QuoteState(TypedDict, total=False):
+    task_text: str
+    current_date: str
+    run_id: str
+    category: str
+    original_task: str
+    classifier_path: str
+    classifier_confidence: float
+    normalized_task: dict
+    task: dict
+    suppliers: list[dict]
+    cursor: int                 # próximo fornecedor da lista
+    supplier: dict | None       # fornecedor em contato
+    question: str | None        # pergunta (ou follow-up) aguardando resposta
+    transcript: list[dict]      # conversa com o fornecedor atual
+    followups: int
+    action: str                 # answer | skip | finish
+    accepted: bool
+    offers: list[dict]
+    message: str
+
+
+def build_quote_graph(checkpointer=None, mode: str | None = None):
+    """
+    Fluxo completo de um orçamento: busca de fornecedores, contato um a um
+    (pergunta -> resposta -> follow-ups) e geração do orçamento.
+
+    A resposta do fornecedor entra por interrupt(): o grafo pausa em
+    `await_answer` e é retomado com Command(resume=<texto>) ou
+    Command(resume={"action": "skip" | "finish"}). Com um checkpointer
+    persistente a sessão (thread_id = run_id) pode ser retomada em outro processo.
+    """
+    from langgraph.config import get_stream_writer
+    from langgraph.graph import StateGraph, END
+    from langgraph.types import interrupt
+    from resources import get_budget_node, get_question_node
+    mode = mode or WORKFLOW_MODE
+    qnode, bnode = get_question_node(), get_budget_node()
+
+    def prepare(state):
+        task = dict(state.get('task') or state.get('normalized_task') or {})
+        task['run_id'] = state.get('run_id')
+        task['current_date'] = state.get('current_date')
+        task['task_text'] = state.get('task_text')   # guardado em quotes: base de treino do train_intent.py
+        return {'task': task, 'cursor': 0, 'offers': [], 'supplier': None}
+    def pick(state):
+        cursor, suppliers = state.get('cursor', 0), state.get('suppliers') or []
+        if len(state.get('offers') or []) >= QUOTE_MAX_OFFERS or cursor >= len(suppliers):
+            return {'supplier': None}
+        return {'supplier': suppliers[cursor], 'cursor': cursor + 1, 'transcript': [], 'followups': 0}
+    def ask(state):
+        # Com stream_mode="custom" a pergunta chega parcial a quem consome (ex.: a UI); no invoke o writer é no-op.
+        writer = get_stream_writer()
+        q = ''
+        for q in qnode.stream(state['task'], state['supplier']):
+            writer({'question_partial': q})
+        return {'question': q, 'transcript': [{'role': 'assistant', 'content': q}]}
+    def await_answer(state):
+        sup = state['supplier']
+        reply = interrupt({'run_id': state.get('run_id'), 'question': state.get('question'),
+                           'supplier': {k: sup.get(k) for k in ('id', 'name', 'location')}})
+        if isinstance(reply, dict) and reply.get('action') in ('skip', 'finish'):
+            if reply['action'] == 'skip':
+                record_outcome(state['task'], sup, 'skipped')
+            return {'action': reply['action']}
+        answer = str(reply.get('answer', '') if isinstance(reply, dict) else reply or '').strip()
+        return {'action': 'answer', 'transcript': state.get('transcript', []) + [{'role': 'supplier', 'content': answer}]}
+    def parse(state):
+        # A conversa é reconstruída do estado: a última resposta já está no transcript.
+        transcript = state.get('transcript', [])
+        conv = SupplierConversation(state['task'], state['supplier'], transcript[:-1], state.get('followups', 0))
+        out = conv.reply(transcript[-1]['content'] if transcript else '')
+        offers = state.get('offers') or []
+        if out['accepted'] and out['offer']:
+            offers = offers + [out['offer']]
+        return {'accepted': out['accepted'], 'offers': offers, 'question': out['question'],
+                'transcript': conv.transcript, 'followups': conv.followups}
+    def budget(state):
+        return bnode.run({'offers': state.get('offers') or [], 'task': state.get('task') or {}})
+
+    g=StateGraph(QuoteState)
+    for name, fn in _lookup_nodes(mode) + [('prepare_contact', prepare), ('pick_supplier', pick),
+                                       ('supplier_question', ask), ('supplier_answer_parser', parse),
+                                       ('budget_generator', budget)]:
+        g.add_node(name, traced_node(name, fn))
+    g.add_node('await_answer', await_answer)   # sem span: o nó é reexecutado ao retomar o interrupt
+    _lookup_edges(g, mode)
+
+    g.add_edge('service', 'prepare_contact')
+    g.add_edge('prepare_contact', 'pick_supplier')
+    g.add_conditional_edges('pick_supplier', lambda s: 'ask' if s.get('supplier') else 'budget',
+        {'ask': 'supplier_question', 'budget': 'budget_generator'})
+    g.add_edge('supplier_question', 'await_answer')
+    g.add_conditional_edges('await_answer', lambda s: s.get('action'),
+        {'answer': 'supplier_answer_parser', 'skip': 'pick_supplier', 'finish': 'budget_generator'})
+    # Sem oferta e com informação faltando: follow-up ao mesmo fornecedor (até QUOTE_MAX_FOLLOWUPS).
+    g.add_conditional_edges('supplier_answer_parser', lambda s: 'wait' if s.get('question') else 'next',
+        {'wait': 'await_answer', 'next': 'pick_supplier'})
+    g.add_edge('budget_generator', END)
+    return g.compile(checkpointer=checkpointer)